@@ -0,0 +1,31 @@
+import asyncio
+
+from c3850_mcp import aio, jsonutil
+from c3850_mcp.device import C3850Device
+
+async def main():
+    print("Initializing device...")
+    async with C3850Device() as device:
+
+        interface_name = "TenGigabitEthernet1/0/2"
+        encoded_name = device._enc(interface_name)
+
+        print(f"Fetching IETF config, IETF state and Cisco operational data for {interface_name}...")
+
+        # One device, one pooled connection: issue the three GETs concurrently
+        results = await asyncio.gather(
+            device._request("GET", f"/ietf-interfaces:interfaces/interface={encoded_name}"),
+            device._request("GET", f"/ietf-interfaces:interfaces-state/interface={encoded_name}"),
+            device._request("GET", f"/Cisco-IOS-XE-interfaces-oper:interfaces/interface={encoded_name}"),
+            return_exceptions=True,
+        )
+
+        for title, data in zip(["IETF Config", "IETF State", "Cisco Oper Data"], results):
+            print(f"{title}:")
+            if isinstance(data, Exception):
+                print(f"Error: {data}")
+            else:
+                print(jsonutil.dumps(data, indent=True))
+
+if __name__ == "__main__":
+    aio.run(main())
@@ -1,24 +1,24 @@
-import sys
 import os
 import asyncio
-from urllib.parse import quote
+import httpx
+from typing import Dict, Optional
 
-# Add src to path
-sys.path.append(os.path.join(os.getcwd(), "src"))
+from c3850_mcp import aio
+from c3850_mcp.device import C3850Device
 
-# Load env vars
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass
+# Cap in-flight RESTCONF calls so a large fan-out doesn't overload the switch
+_sem = asyncio.Semaphore(int(os.getenv("C3850_MAX_CONCURRENCY", "8")))
 
-from c3850_mcp.device import C3850Device
+# Interfaces per collection PATCH when the device rejects one large payload
+_CHUNK_SIZE = 20
+
+# Rejections that may come from one bad entry, so a smaller batch can still succeed
+_SPLITTABLE_STATUSES = frozenset({400, 404, 409, 422})
+# Auth failures would fail every smaller batch too
+_AUTH_STATUSES = frozenset({401, 403})
 
 async def set_interface_description(device: C3850Device, interface: str, description: str):
     """Set description for an interface."""
-    from urllib.parse import quote
-    
     payload = {
         "ietf-interfaces:interface": {
             "name": interface,
@@ -26,41 +26,85 @@ async def set_interface_description(device: C3850Device, interface: str, descrip
         }
     }
     
-    encoded_interface = quote(interface, safe='')
+    encoded_interface = device._enc(interface)
     return await device._request("PATCH", f"/ietf-interfaces:interfaces/interface={encoded_interface}", json=payload)
 
+async def _patch_descriptions(device: C3850Device, mapping: Dict[str, str]) -> Dict[str, Optional[Exception]]:
+    """PATCH a batch of descriptions, splitting the batch if the device rejects it."""
+    try:
+        async with _sem:
+            if len(mapping) == 1:
+                (name, description), = mapping.items()
+                await set_interface_description(device, name, description)
+            else:
+                payload = {
+                    "ietf-interfaces:interfaces": {
+                        "interface": [{"name": n, "description": d} for n, d in mapping.items()]
+                    }
+                }
+                await device._request("PATCH", "/ietf-interfaces:interfaces", json=payload)
+        return {name: None for name in mapping}
+    except httpx.HTTPStatusError as e:
+        status = e.response.status_code
+        if status in _AUTH_STATUSES:
+            raise
+        # Only a refused payload is worth splitting; anything else is fatal for the batch
+        if len(mapping) == 1 or status not in _SPLITTABLE_STATUSES:
+            return {name: e for name in mapping}
+    except Exception as e:
+        return {name: e for name in mapping}
+
+    # Retry in chunks of _CHUNK_SIZE, then one port at a time
+    size = _CHUNK_SIZE if len(mapping) > _CHUNK_SIZE else 1
+    names = list(mapping)
+    chunks = [{n: mapping[n] for n in names[i:i + size]} for i in range(0, len(names), size)]
+    results: Dict[str, Optional[Exception]] = {}
+    for chunk_result in await asyncio.gather(*(_patch_descriptions(device, c) for c in chunks)):
+        results.update(chunk_result)
+    return results
+
+async def set_interface_descriptions_bulk(device: C3850Device, mapping: Dict[str, str]) -> Dict[str, Optional[Exception]]:
+    """Set descriptions for many interfaces in a single RESTCONF PATCH.
+
+    Returns a map of interface name to the exception raised for it, or None on success.
+    A 401/403 is raised right away rather than retried in smaller batches.
+    """
+    if not mapping:
+        return {}
+    return await _patch_descriptions(device, mapping)
+
 async def main():
-    device = C3850Device()
+    async with C3850Device() as device:
     
-    print("Fetching interface status...")
-    interfaces = await device.get_interfaces_status()
+        print("Fetching interface status...")
+        interfaces = await device.get_interfaces_status(fields=("name", "description", "admin-status"))
     
-    # Find admin down ports with empty or no description
-    ports_to_update = []
-    for iface in interfaces:
-        if iface.get('admin_status') == 'down':
-            desc = iface.get('description', '').strip()
-            if not desc or desc == '()':
-                ports_to_update.append(iface['name'])
+        # Find admin down ports with empty or no description
+        ports_to_update = []
+        for iface in interfaces:
+            if iface.admin_status == 'down':
+                desc = (iface.description or '').strip()
+                if not desc or desc == '()':
+                    ports_to_update.append(iface.name)
     
-    if not ports_to_update:
-        print("No ports found that need description updates.")
-        return
+        if not ports_to_update:
+            print("No ports found that need description updates.")
+            return
     
-    print(f"\nFound {len(ports_to_update)} admin down ports with no description:")
-    for port in ports_to_update:
-        print(f"  - {port}")
+        print(f"\nFound {len(ports_to_update)} admin down ports with no description:")
+        for port in ports_to_update:
+            print(f"  - {port}")
     
-    print(f"\nSetting description to 'NOT USED' for {len(ports_to_update)} ports...")
+        print(f"\nSetting description to 'NOT USED' for {len(ports_to_update)} ports...")
     
-    for port in ports_to_update:
-        try:
-            await set_interface_description(device, port, "NOT USED")
-            print(f"  ✓ {port} - Description set to 'NOT USED'")
-        except Exception as e:
-            print(f"  ✗ {port} - Failed: {e}")
+        results = await set_interface_descriptions_bulk(device, {p: "NOT USED" for p in ports_to_update})
+        for port, error in results.items():
+            if error is None:
+                print(f"  ✓ {port} - Description set to 'NOT USED'")
+            else:
+                print(f"  ✗ {port} - Failed: {error}")
     
-    print("\nDone!")
+        print("\nDone!")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    aio.run(main())
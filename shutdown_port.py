@@ -1,56 +1,53 @@
-import sys
 import os
 import asyncio
 import argparse
 from typing import List
 
-# Add src to path
-sys.path.append(os.path.join(os.getcwd(), "src"))
+from c3850_mcp import aio
+from c3850_mcp.daemon import connect
+from c3850_mcp.device import description_matcher
 
-from c3850_mcp.device import C3850Device, DeviceConfig
-
-async def main(search_term: str):
-    # Load env vars
-    try:
-        from dotenv import load_dotenv
-        load_dotenv()
-    except ImportError:
-        pass
+# Cap in-flight RESTCONF calls so a large fan-out doesn't overload the switch
+_sem = asyncio.Semaphore(int(os.getenv("C3850_MAX_CONCURRENCY", "8")))
 
+async def main(search_terms: List[str]):
     # Initialize device - will pick up env vars automatically
-    device = C3850Device()
+    async with connect() as device:
     
-    print(f"Fetching interface status...")
-    interfaces = await device.get_interfaces_status()
+        print(f"Fetching interface status...")
+        matches = description_matcher(search_terms)
+        matching_ports = [i async for i in device.iter_interfaces_status() if matches(i)]
     
-    matching_ports = []
-    for iface in interfaces:
-        desc = iface.get("description", "")
-        # Case-insensitive search
-        if search_term.lower() in desc.lower():
-            matching_ports.append(iface)
+        search_label = "', '".join(search_terms)
             
-    if not matching_ports:
-        print(f"No ports found with '{search_term}' in description.")
-        return
+        if not matching_ports:
+            print(f"No ports found with '{search_label}' in description.")
+            return
 
-    print(f"Found {len(matching_ports)} port(s) matching '{search_term}':")
-    for port in matching_ports:
-        print(f"  - {port['name']}: {port['description']} (Status: {port['admin_status']})")
+        print(f"Found {len(matching_ports)} port(s) matching '{search_label}':")
+        for port in matching_ports:
+            print(f"  - {port.name}: {port.description} (Status: {port.admin_status})")
         
-    print(f"\nShutting down ports...")
-    for port in matching_ports:
-        name = port['name']
-        print(f"Shutting down {name}...")
-        try:
-            await device.set_interface_state(name, "down")
-            print(f"  Success: {name} is now down.")
-        except Exception as e:
-            print(f"  Failed to shutdown {name}: {e}")
+        async def _shutdown(port):
+            try:
+                async with _sem:
+                    await device.set_interface_state(port.name, "down")
+                return port.name, None
+            except Exception as e:
+                return port.name, e
+
+        print(f"\nShutting down ports...")
+        # Dispatch all ports at once so total latency is one round trip, not N
+        results = await asyncio.gather(*(_shutdown(p) for p in matching_ports))
+        for name, error in results:
+            if error is None:
+                print(f"  Success: {name} is now down.")
+            else:
+                print(f"  Failed to shutdown {name}: {error}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Shutdown network ports by description search term.")
-    parser.add_argument("search_term", type=str, help="Search term to find in interface descriptions (case-insensitive)")
+    parser.add_argument("search_terms", type=str, nargs="+", help="Search term(s) to find in interface descriptions (case-insensitive, any term matches)")
     args = parser.parse_args()
     
-    asyncio.run(main(args.search_term))
+    aio.run(main(args.search_terms))
@@ -0,0 +1,16 @@
+"""Event loop helpers that use uvloop when it is installed and fall back to asyncio."""
+import asyncio
+from typing import Any, Coroutine
+
+try:
+    import uvloop
+except ImportError:
+    # Not installed, or on Windows where uvloop isn't available
+    uvloop = None
+
+
+def run(main: Coroutine[Any, Any, Any]) -> Any:
+    """Drop-in for asyncio.run() that runs on uvloop's libuv-based loop when available."""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
@@ -0,0 +1,256 @@
+"""Long-lived local daemon that keeps one C3850Device (and its TLS session) warm.
+
+The helper scripts each start Python, open an HTTPS connection, do one thing and
+exit. Run ``python -m c3850_mcp.daemon`` once per session and the scripts RPC into
+it over a unix socket instead, so the handshake is paid once rather than per run.
+Scripts obtain a device through ``connect()``, which falls back to a direct
+C3850Device when no daemon is listening.
+
+Wire format: one JSON object per line in each direction.
+    request:  {"id": 1, "method": "get_interfaces_status", "args": [], "kwargs": {}}
+    response: {"id": 1, "ok": true, "result": ...}
+              {"id": 1, "ok": false, "error": "HTTPStatusError: ..."}
+
+set_interface_state calls are held for WRITE_COALESCE_WINDOW and flushed together
+through C3850Device.set_interface_states() (see InterfaceStateBatcher); pass
+force_immediate=True (daemon only) to skip the buffer.
+"""
+import os
+import asyncio
+import logging
+import tempfile
+import dataclasses
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Union
+
+from c3850_mcp import aio, jsonutil
+from c3850_mcp.device import C3850Device, InterfaceStateBatcher, InterfaceStatus
+
+logger = logging.getLogger("c3850-daemon")
+
+SOCKET_PATH = os.getenv("C3850_DAEMON_SOCKET") or os.path.join(tempfile.gettempdir(), f"c3850d-{os.getuid()}.sock")
+
+# Transceiver and log payloads can be large; the default 64 KiB line limit is too small
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+# Only these device methods are reachable over the socket
+DAEMON_METHODS = frozenset({
+    "get_interfaces_status",
+    "get_vlan_brief",
+    "get_system_summary",
+    "get_transceiver_stats",
+    "get_device_health",
+    "get_cpu",
+    "get_memory",
+    "get_environment",
+    "get_recent_logs",
+    "check_interface_errors",
+    "get_interface_details",
+    "analyze_interface_impact",
+    "analyze_vlan_impact",
+    "set_interface_state",
+    "set_interface_states",
+    "set_interface_vlan",
+    "set_vlan_name",
+    "bounce_interface",
+})
+
+# set_interface_state calls arriving within this window go out as one collection PATCH
+WRITE_COALESCE_WINDOW = 0.02
+
+# Rebuild typed results on the client so scripts see the same objects as with a direct device
+_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "get_interfaces_status": lambda rows: [InterfaceStatus(**row) for row in rows],
+}
+
+
+class DaemonError(Exception):
+    """An error raised by the device inside the daemon, re-raised on the client."""
+
+
+def _to_wire(obj: Any) -> Any:
+    """Convert results into JSON-serializable values (dataclasses become dicts)."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (list, tuple)):
+        return [_to_wire(item) for item in obj]
+    if isinstance(obj, dict):
+        return {key: _to_wire(value) for key, value in obj.items()}
+    return obj
+
+
+class DeviceDaemon:
+    """Serves whitelisted C3850Device methods over a unix socket."""
+
+    def __init__(self, device: Optional[C3850Device] = None, socket_path: Optional[str] = None,
+                 coalesce_window: float = WRITE_COALESCE_WINDOW):
+        self.device = device or C3850Device()
+        self.socket_path = socket_path or SOCKET_PATH
+        self.coalesce_window = coalesce_window
+        # Looked up on every flush, so a device whose methods are swapped later still gets the calls.
+        # The unbatched write is used so the device's own write_batch_window doesn't stack on ours.
+        self._state_batcher = InterfaceStateBatcher(
+            coalesce_window,
+            lambda interface, state: self.device._apply_interface_state(interface, state),
+            lambda states: self.device.set_interface_states(states),
+        )
+
+    async def serve_forever(self) -> None:
+        # A socket file left behind by a crashed daemon would make bind() fail
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        try:
+            await self.device.warmup()
+        except Exception as e:
+            # Not fatal: the switch may come up later, and the first call will connect then
+            logger.warning("Warm-up connection to the switch failed: %s", e)
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path, limit=_STREAM_LIMIT)
+        # Anyone who can connect can reconfigure the switch; keep the socket private to this user
+        os.chmod(self.socket_path, 0o600)
+        logger.info("Listening on %s", self.socket_path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.device.aclose()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line: bytes) -> None:
+            reply = await self._dispatch(line)
+            async with write_lock:
+                writer.write(jsonutil.dumps(reply).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # Handle each request as its own task so a client can pipeline calls
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, line: bytes) -> Dict[str, Any]:
+        request_id = None
+        try:
+            message = jsonutil.loads(line)
+            request_id = message.get("id")
+            method = message.get("method")
+            if method not in DAEMON_METHODS:
+                raise ValueError(f"Method not allowed: {method}")
+            args, kwargs = message.get("args", []), message.get("kwargs", {})
+            if method == "set_interface_state" and self.coalesce_window > 0 and not kwargs.pop("force_immediate", False):
+                result = await self._state_batcher.submit(*args, **kwargs)
+            else:
+                kwargs.pop("force_immediate", None)
+                result = await getattr(self.device, method)(*args, **kwargs)
+            return {"id": request_id, "ok": True, "result": _to_wire(result)}
+        except Exception as e:
+            logger.error("Daemon call failed: %s", e)
+            return {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+class DaemonClient:
+    """Client-side stand-in for C3850Device that forwards calls to the daemon."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def _read_responses(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                reply = jsonutil.loads(line)
+                future = self._pending.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(DaemonError("Connection to daemon closed"))
+            self._pending.clear()
+
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if method not in DAEMON_METHODS:
+            raise AttributeError(method)
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(jsonutil.dumps({"id": request_id, "method": method, "args": list(args), "kwargs": kwargs}).encode() + b"\n")
+        await self._writer.drain()
+        reply = await future
+        if not reply.get("ok"):
+            raise DaemonError(reply.get("error"))
+        decode = _DECODERS.get(method)
+        return decode(reply["result"]) if decode else reply["result"]
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name not in DAEMON_METHODS:
+            raise AttributeError(name)
+
+        async def forward(*args: Any, **kwargs: Any) -> Any:
+            return await self.call(name, *args, **kwargs)
+        return forward
+
+    # Pure string handling; no reason to round-trip to the daemon
+    normalize_interface_name = staticmethod(C3850Device.normalize_interface_name)
+
+    async def iter_interfaces_status(self, *args: Any, **kwargs: Any) -> AsyncIterator[InterfaceStatus]:
+        for iface in await self.call("get_interfaces_status", *args, **kwargs):
+            yield iface
+
+    async def aclose(self) -> None:
+        self._writer.close()
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+
+@asynccontextmanager
+async def connect(socket_path: Optional[str] = None) -> AsyncIterator[Union[C3850Device, DaemonClient]]:
+    """Yield a daemon client if the daemon is running, otherwise a direct C3850Device."""
+    try:
+        reader, writer = await asyncio.open_unix_connection(socket_path or SOCKET_PATH, limit=_STREAM_LIMIT)
+    except OSError:
+        async with C3850Device() as device:
+            yield device
+        return
+
+    client = DaemonClient(reader, writer)
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        aio.run(DeviceDaemon().serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,128 +1,515 @@
 import os
+import re
+import ssl
+import socket
 import asyncio
+import importlib.util
 import httpx
-import jmespath
 import time
-from functools import wraps
-from typing import Any, Dict, List, Optional
+import logging
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 from urllib.parse import quote
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+from c3850_mcp import jsonutil
+
+logger = logging.getLogger("c3850-device")
+
+# Load .env once for every entry point that imports the device layer
+try:
+    from dotenv import find_dotenv, load_dotenv
+    # Scripts run from the project root; otherwise search upward from this file
+    load_dotenv(find_dotenv(usecwd=True)) or load_dotenv()
+except ImportError:
+    pass
+
+# HTTP/2 lets concurrent requests share one TLS connection; httpx needs the optional 'h2' package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Probe well before NAT/firewall idle timers reap the connection, so the next call doesn't stall
+# on a dead socket: (socket option, env var, default seconds/count)
+_KEEPALIVE_TUNABLES = (
+    ("TCP_KEEPIDLE", "C3850_TCP_KEEPIDLE", 45),
+    ("TCP_KEEPINTVL", "C3850_TCP_KEEPINTVL", 20),
+    ("TCP_KEEPCNT", "C3850_TCP_KEEPCNT", 5),
+)
+
+def _socket_options() -> List[Tuple[int, int, int]]:
+    """Disable Nagle for small RESTCONF requests and let the kernel probe idle pooled connections."""
+    options = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+    # Not every platform exposes all three knobs (macOS lacks TCP_KEEPIDLE)
+    for opt, env, default in _KEEPALIVE_TUNABLES:
+        if not hasattr(socket, opt):
+            continue
+        raw = os.getenv(env)
+        try:
+            value = int(raw) if raw else default
+        except ValueError:
+            # A typo in the environment shouldn't make the whole package unimportable
+            logger.warning("Ignoring non-integer %s=%r; using %d", env, raw, default)
+            value = default
+        options.append((socket.IPPROTO_TCP, getattr(socket, opt), value))
+    return options
+
+SOCKET_OPTIONS = _socket_options()
+
+def _build_ssl_context() -> ssl.SSLContext:
+    """TLS context shared by every device client; built once instead of per client."""
+    # Switches present self-signed certs, so no verification (same as verify=False), but no pre-1.2 TLS
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_2
+    return ctx
+
+SSL_CONTEXT = _build_ssl_context()
+
+# RFC 8072 YANG-Patch lets several edits across YANG roots land in one atomic request
+YANG_PATCH_CONTENT_TYPE = "application/yang-patch+json"
+# Statuses meaning the device won't take a YANG-Patch at all (as opposed to rejecting this one)
+_YANG_PATCH_UNSUPPORTED = frozenset({405, 415, 501})
+# Back-to-back 400s before a YANG-Patch rejection is treated as the device's, not the payload's
+_YANG_PATCH_MAX_400S = 3
+
+# How long a get_interfaces_status() result stays fresh for repeat callers
+IFACE_STATUS_TTL = 5.0
+
+# Leaves get_interfaces_status() can request; RESTCONF 'fields=' keeps everything else off the wire
+IFACE_STATE_LEAVES = ("name", "admin-status", "oper-status", "speed", "phys-address")
+IFACE_CONFIG_LEAVES = ("name", "description", "enabled")
+# Requested field -> config leaf that supplies it; admin_status is derived from 'enabled' when present
+_CONFIG_LEAF_FOR = {"description": "description", "admin-status": "enabled"}
+DEFAULT_IFACE_FIELDS = ("name", "description", "admin-status", "oper-status", "speed", "phys-address")
+# Per-interface subtrees get_transceiver_stats() keeps; the full interfaces-oper list runs to megabytes
+TRANSCEIVER_FIELDS = ("name", "oper-status", "statistics", "ether-stats")
+
+# Splits 'GigabitEthernet1/0/1' into its type and number for native-model paths
+_IFACE_RE = re.compile(r"([A-Za-z]+)([\d/.]+)")
+# Native interface lists that set_interface_state knows how to write
+_NATIVE_INTERFACE_TYPES = frozenset({"TenGigabitEthernet", "GigabitEthernet", "FastEthernet", "FortyGigabitEthernet", "Vlan"})
+
+# Two-letter abbreviation -> full IOS interface type. Every type has a distinct
+# abbreviation, so one dict probe on the first two characters finds the candidate.
+_INTERFACE_TYPES = {
+    "te": "TenGigabitEthernet",
+    "gi": "GigabitEthernet",
+    "fa": "FastEthernet",
+    "fo": "FortyGigabitEthernet",
+    "vl": "Vlan",
+}
+_INTERFACE_TYPES_LOWER = {abbrev: full.lower() for abbrev, full in _INTERFACE_TYPES.items()}
+
+# Sized for a full stack of 3850s' worth of port names in both short and long forms
+@lru_cache(maxsize=1024)
+def _normalize_interface_name(name: str) -> str:
+    """Expand 'Te1/0/1' to 'TenGigabitEthernet1/0/1'; full names get canonical casing."""
+    abbrev = name[:2].lower()
+    full_name = _INTERFACE_TYPES.get(abbrev)
+    if full_name is None:
+        return name # Return raw string if no match
+    # Already spelled out (in any case): swap in the canonical spelling, keep the number
+    long_lower = _INTERFACE_TYPES_LOWER[abbrev]
+    if name[:len(long_lower)].lower() == long_lower:
+        return full_name + name[len(long_lower):]
+    return full_name + name[2:]
+
+# Keyword filters get_interfaces_status() understands; anything else is an interface name
+_STATUS_KEYWORDS = frozenset({"up", "down", "connected", "not connected"})
+
+def _canonical_filter(status_filter: Optional[str]) -> Optional[str]:
+    """Reduce a status filter to one spelling so equivalent filters share a cache entry.
+
+    ' UP ' becomes 'up' and 'Gi1/0/1' becomes 'GigabitEthernet1/0/1'; a blank filter is None.
+    """
+    if not status_filter or not status_filter.strip():
+        return None
+    token = status_filter.strip()
+    keyword = " ".join(token.lower().split())
+    if keyword in _STATUS_KEYWORDS:
+        return keyword
+    return _normalize_interface_name(token)
+
+def _neighbors_on(neighbors: List[Dict[str, Any]], local_key: str, interface: str) -> List[Dict[str, Any]]:
+    """Keep the CDP/LLDP entries whose local interface is `interface`, in short or long form."""
+    # Lowercase spellings of the target, computed once rather than per neighbor
+    accepted = {interface.lower(), _normalize_interface_name(interface).lower()}
+    matched = []
+    for n in neighbors:
+        local_intf = n.get(local_key, "").lower()
+        # Try exact match or normalized match (entries may use short names like 'Gi1/0/1')
+        if local_intf in accepted or _normalize_interface_name(local_intf).lower() in accepted:
+            matched.append(n)
+    return matched
+
+def _walk_strings(obj: Any, path: str = "") -> Iterator[str]:
+    """Yield every scalar leaf of a JSON tree as 'parent/key: value' text."""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            yield from _walk_strings(v, f"{path}/{k}" if path else k)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _walk_strings(item, path)
+    else:
+        yield f"{path}: {obj}" if path else str(obj)
+
+def _dig(data: Any, *keys: str, default: Any = None) -> Any:
+    """Follow nested dict keys, returning default as soon as a level is missing or not a dict."""
+    for key in keys:
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key)
+        if data is None:
+            return default
+    return data
+
+# Shared read-only stand-in for a missing config entry, instead of a new {} per interface
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+_EMPTY_FS: frozenset = frozenset()
+# Fixed part of get_system_summary(): platform is hardcoded as we know the device type (or could
+# extract it); uptime lives in a different model, keeping simple for now
+_SYS_CONST: Mapping[str, str] = MappingProxyType({"platform": "Cisco 3850", "uptime": "Unknown"})
+
+# Cache key for methods called with no arguments, the common case
+_NO_ARGS = object()
+
+async def _no_data() -> Dict[str, Any]:
+    """Stand-in for a request that doesn't need to be made, so it can sit in an asyncio.gather()."""
+    return {}
 
 class DeviceConfig(BaseModel):
+    # Read-only once built; a typo'd field is an error rather than silently ignored
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     host: str
     username: str
     password: str
     port: int = 443
+    # Max RESTCONF requests in flight, enforced by a semaphore in _request (an HTTP/2 connection
+    # would otherwise carry ~100 streams); IOS-XE's httpd forks per request, so keep it modest
+    max_concurrency: int = 8
+    # Seconds to hold set_interface_state() calls so concurrent ones go out as one bulk write; 0 = off
+    write_batch_window: float = 0.0
+
+@lru_cache(maxsize=1)
+def _default_config() -> DeviceConfig:
+    """DeviceConfig from the C3850_* environment, read and validated once per process.
+
+    Safe to share between devices because DeviceConfig is frozen.
+    """
+    return DeviceConfig(
+        host=os.getenv("C3850_HOST", ""),
+        username=os.getenv("C3850_USERNAME", ""),
+        password=os.getenv("C3850_PASSWORD", ""),
+        port=int(os.getenv("C3850_PORT", "443")),
+        max_concurrency=int(os.getenv("C3850_MAX_CONCURRENCY", "8")),
+        write_batch_window=float(os.getenv("C3850_WRITE_BATCH_WINDOW", "0")),
+    )
 
-def ttl_cache(ttl: int = 60):
-    """Simple TTL cache decorator for async methods."""
+@dataclass(slots=True, frozen=True)
+class InterfaceStatus:
+    """One row of get_interfaces_status(); leaves that weren't fetched are left empty."""
+    name: str
+    description: str = ""
+    admin_status: Optional[str] = None
+    oper_status: Optional[str] = None
+    speed: Union[int, str, None] = None
+    mac: Optional[str] = None
+
+def description_matcher(search_terms: List[str]) -> Callable[[InterfaceStatus], bool]:
+    """Build a predicate that is True when a description contains any search term (case-insensitive)."""
+    if len(search_terms) == 1:
+        needle = search_terms[0].lower()
+        return lambda i: needle in (i.description or "").lower()
+    pattern = re.compile("|".join(map(re.escape, search_terms)), re.IGNORECASE)
+    return lambda i: pattern.search(i.description or "") is not None
+
+# Instance attributes holding ttl_cache(invalidate_on_write=True) results; dropped by every write
+_WRITE_INVALIDATED_CACHES: set = set()
+
+def ttl_cache(ttl: float = 60, maxsize: int = 128, invalidate_on_write: bool = False):
+    """TTL cache decorator for async methods.
+
+    Results are cached per instance, so two devices never see each other's data.
+    Concurrent misses for the same arguments share one in-flight call instead of
+    each going to the switch. Each method keeps at most maxsize entries, dropping
+    the oldest first. With invalidate_on_write, any write through _request()
+    empties the cache, for reads whose answer a config change can alter.
+    """
     def decorator(func):
-        cache = {}
-        
+        # Each decorated method gets its own per-instance dict, so keys need not carry the name
+        cache_attr = f"_ttl_cache_{func.__name__}"
+        if invalidate_on_write:
+            _WRITE_INVALIDATED_CACHES.add(cache_attr)
+
         @wraps(func)
         async def wrapper(self, *args, **kwargs):
-            # Create a key based on arguments
-            key = (func.__name__, args, frozenset(kwargs.items()))
-            now = time.time()
-            
-            if key in cache:
-                result, timestamp = cache[key]
-                if now - timestamp < ttl:
-                    return result
-            
-            result = await func(self, *args, **kwargs)
-            cache[key] = (result, now)
-            return result
-            
+            cache = self.__dict__.get(cache_attr)
+            if cache is None:
+                cache = self.__dict__[cache_attr] = OrderedDict()
+            if not args and not kwargs:
+                key = _NO_ARGS
+            else:
+                key = (args, frozenset(kwargs.items()) if kwargs else _EMPTY_FS)
+
+            entry = cache.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None:
+                    # Another caller is already fetching this key
+                    return await asyncio.shield(value)
+                if time.monotonic() < expires_at:
+                    return value
+
+            task = asyncio.ensure_future(func(self, *args, **kwargs))
+            cache[key] = (task, None)
+            cache.move_to_end(key)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+
+            def store(done: asyncio.Future) -> None:
+                # Skip if the entry was dropped or replaced while the call was in flight
+                if cache.get(key, (None,))[0] is not done:
+                    return
+                if done.cancelled() or done.exception() is not None:
+                    del cache[key]
+                else:
+                    cache[key] = (done.result(), time.monotonic() + ttl)
+
+            task.add_done_callback(store)
+            return await asyncio.shield(task)
+
         return wrapper
     return decorator
 
+class InterfaceStateBatcher:
+    """Coalesces interface state changes submitted within `window` seconds into one bulk write.
+
+    Repeats of the same state for an interface share one write. A different state for
+    an interface already in the batch closes that batch and starts the next, so a
+    down followed by an up is written in order rather than collapsing to the up.
+    A batch of one goes through apply_one, anything larger through apply_many
+    ({interface: state}). If apply_many fails, each port is retried with apply_one,
+    so callers only see the error from their own port.
+    """
+
+    def __init__(self, window: float,
+                 apply_one: Callable[[str, str], Awaitable[Dict[str, Any]]],
+                 apply_many: Callable[[Dict[str, str]], Awaitable[Dict[str, Any]]]):
+        self.window = window
+        self._apply_one = apply_one
+        self._apply_many = apply_many
+        # interface -> (state, waiters) for the batch still collecting
+        self._pending: Dict[str, Tuple[str, List[asyncio.Future]]] = {}
+        # Closed batches waiting their turn, oldest first
+        self._closed: List[Dict[str, Tuple[str, List[asyncio.Future]]]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def submit(self, interface: str, state: str) -> asyncio.Future:
+        """Queue a state change; the returned future resolves when it has been written."""
+        # Normalize so 'Gi1/0/1' and 'GigabitEthernet1/0/1' land on the same key
+        interface = _normalize_interface_name(interface)
+        entry = self._pending.get(interface)
+        if entry is not None and entry[0] != state:
+            self._closed.append(self._pending)
+            self._pending, entry = {}, None
+        if entry is None:
+            entry = self._pending[interface] = (state, [])
+        waiter = asyncio.get_running_loop().create_future()
+        entry[1].append(waiter)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        return waiter
+
+    async def _flush(self) -> None:
+        batches: List[Dict[str, Tuple[str, List[asyncio.Future]]]] = []
+        try:
+            await asyncio.sleep(self.window)
+            # Changes submitted while a batch is being written are picked up on the next pass
+            while self._pending or self._closed:
+                batches = self._closed + [self._pending] if self._pending else self._closed
+                self._pending, self._closed = {}, []
+                while batches:
+                    await self._write(batches[0])
+                    batches.pop(0)
+        finally:
+            self._flush_task = None
+            # Only non-empty if the flush was cancelled: nothing will write these, so don't leave
+            # their callers waiting forever
+            for batch in batches + self._closed + [self._pending]:
+                for _, waiters in batch.values():
+                    _resolve(waiters, error=asyncio.CancelledError())
+            self._pending, self._closed = {}, []
+
+    async def _write(self, batch: Dict[str, Tuple[str, List[asyncio.Future]]]) -> None:
+        states = {interface: state for interface, (state, _) in batch.items()}
+        if len(states) > 1:
+            try:
+                result = await self._apply_many(states)
+            except Exception as e:
+                # Fall through to per-port writes so one bad port can't fail the others
+                logger.warning("Bulk state write of %d ports failed (%s); retrying each port", len(states), e)
+            else:
+                for _, waiters in batch.values():
+                    _resolve(waiters, result)
+                return
+        for interface, (state, waiters) in batch.items():
+            try:
+                result = await self._apply_one(interface, state)
+            except Exception as e:
+                _resolve(waiters, error=e)
+            else:
+                _resolve(waiters, result)
+
+
+def _resolve(waiters: List[asyncio.Future], result: Any = None, error: Optional[BaseException] = None) -> None:
+    for waiter in waiters:
+        if not waiter.done():
+            if isinstance(error, asyncio.CancelledError):
+                waiter.cancel()  # Awaiters see CancelledError, without a "never retrieved" warning
+            elif error is not None:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result(result)
+
+
 class C3850Device:
     def __init__(self, config: Optional[DeviceConfig] = None, http_client: Optional[httpx.AsyncClient] = None):
-        self.http_client = http_client
-        self.semaphore = asyncio.Semaphore(2)
-        if config:
-            self.config = config
-        else:
-            self.config = DeviceConfig(
-                host=os.getenv("C3850_HOST", ""),
-                username=os.getenv("C3850_USERNAME", ""),
-                password=os.getenv("C3850_PASSWORD", ""),
-                port=int(os.getenv("C3850_PORT", "443")),
-            )
+        # Only close clients we created; an injected client belongs to the caller
+        self._owns_client = http_client is None
+        self.config = config or _default_config()
         self.base_url = f"https://{self.config.host}:{self.config.port}/restconf/data"
         self.headers = {
             "Accept": "application/yang-data+json",
             "Content-Type": "application/yang-data+json",
         }
         self.auth = (self.config.username, self.config.password)
+        # Per-request arguments that never change, built once instead of on every call.
+        # Our own client carries base_url and joins paths itself; an injected one gets full URLs.
+        self._url_prefix = "" if self._owns_client else self.base_url
+        self._req_kwargs = {"auth": self.auth, "timeout": 10.0}
+        # One pooled client for the device's lifetime, so every request reuses kept-alive TLS connections
+        self.http_client = http_client if http_client is not None else self._build_client()
+        # Callers beyond max_concurrency queue here rather than timing out waiting for a pooled connection
+        self._request_slots = asyncio.Semaphore(self.config.max_concurrency)
+        # (status_filter, fields) -> (monotonic timestamp, interfaces); cleared on every write
+        self._iface_cache: Dict[tuple, tuple] = {}
+        # Interface names recur constantly, so keep their URL-encoded form around
+        self._encoded: Dict[str, str] = {}
+        # Path -> (ETag, parsed body) for conditional GETs
+        self._etags: Dict[str, Tuple[str, Any]] = {}
+        # None until the first YANG-Patch attempt tells us whether the device accepts them
+        self._yang_patch_supported: Optional[bool] = None
+        self._yang_patch_400s = 0
+        # Opt-in: concurrent set_interface_state() calls share one set_interface_states() write
+        self._state_batcher = InterfaceStateBatcher(
+            self.config.write_batch_window, self._apply_interface_state, self.set_interface_states
+        ) if self.config.write_batch_window > 0 else None
+
+    async def __aenter__(self) -> "C3850Device":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client if this device created it."""
+        if self._owns_client and self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    def _enc(self, name: str) -> str:
+        """Return name percent-encoded for use as a RESTCONF list key (e.g. 1/0/2 -> 1%2F0%2F2)."""
+        try:
+            return self._encoded[name]
+        except KeyError:
+            encoded = self._encoded[name] = quote(name, safe='')
+            return encoded
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the device's own pooled HTTP client.
+
+        Reusing one client keeps TLS sessions alive between requests instead of
+        paying a fresh handshake against the switch for every call. With HTTP/2
+        available, concurrent requests multiplex over that single connection.
+        """
+        # Sized to match the _request semaphore, so a request holding a slot never waits on the pool
+        size = self.config.max_concurrency
+        # Outlast the gap between MCP tool calls so each one reuses the connection rather than re-handshaking
+        limits = httpx.Limits(max_keepalive_connections=size, max_connections=size, keepalive_expiry=75.0)
+        # retries only covers failed connection attempts, so it is safe for writes too
+        transport = httpx.AsyncHTTPTransport(
+            verify=SSL_CONTEXT, limits=limits, http2=HTTP2_AVAILABLE, socket_options=SOCKET_OPTIONS, retries=1
+        )
+        return httpx.AsyncClient(base_url=self.base_url, transport=transport, timeout=10.0)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, rebuilding it if the device was closed and reused."""
+        if self.http_client is None:
+            self.http_client = self._build_client()
+        return self.http_client
+
+    async def warmup(self, prime_caches: bool = False) -> None:
+        """Open a pooled connection to the switch ahead of the first real call.
 
-    def normalize_interface_name(self, name: str) -> str:
+        A tiny GET pays the DNS lookup and the TCP/TLS handshakes up front; later
+        requests reuse the kept-alive connection and skip all three. With
+        prime_caches=True the cached transceiver and interface status reads are
+        fetched instead, so the first tool call for either is a cache hit. Each
+        prime that fails is logged on its own and leaves the others in place.
+        """
+        if prime_caches:
+            primes = {"transceiver stats": self.get_transceiver_stats(), "interface status": self.get_interfaces_status()}
+            outcomes = await asyncio.gather(*primes.values(), return_exceptions=True)
+            for name, outcome in zip(primes, outcomes):
+                # Cancellation (and other non-Exception BaseExceptions) must propagate, never become a value
+                if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                    raise outcome
+                if isinstance(outcome, Exception):
+                    logger.warning("Warm-up prime of %s failed: %s", name, outcome)
+            return
+        await self._request("GET", "/ietf-interfaces:interfaces-state?fields=interface(name)")
+
+    @staticmethod
+    def normalize_interface_name(name: str) -> str:
         """Helper to expand short names like 'Te1/0/1' to full IOS names."""
-        name_lower = name.lower()
-        
-        # Map of prefix to (full_name, prefix_length_to_replace)
-        # Order matters: check longer matches first if there's overlap, 
-        # but here we check full names first to avoid double replacement.
-        mappings = [
-            ("tengigabitethernet", "TenGigabitEthernet"),
-            ("gigabitethernet", "GigabitEthernet"),
-            ("fastethernet", "FastEthernet"),
-            ("fortygigabitethernet", "FortyGigabitEthernet"),
-            ("vlan", "Vlan"),
-            ("te", "TenGigabitEthernet"),
-            ("gi", "GigabitEthernet"),
-            ("fa", "FastEthernet"),
-            ("fo", "FortyGigabitEthernet"),
-            ("vl", "Vlan"),
-        ]
-
-        for prefix, full_name in mappings:
-            if name_lower.startswith(prefix):
-                # Replace the prefix with the full name
-                # We use the length of the matched prefix to slice the original string's number part
-                # But wait, we want to replace the *start* of the string.
-                # And we want to preserve the rest of the string (the numbers).
-                # Since we matched on lower, we can just replace the start.
-                return full_name + name[len(prefix):]
-        
-        return name # Return raw string if no match
+        return _normalize_interface_name(name)
 
-    async def get_cdp_neighbors(self, interface: str) -> List[Dict[str, Any]]:
-        """Get CDP neighbors for an interface."""
+    # Neighbor tables only change on CDP/LLDP advertisement timers (60s/30s), so a
+    # short cache lets repeated impact checks filter one fetched table
+    @ttl_cache(ttl=30)
+    async def _get_cdp_table(self) -> List[Dict[str, Any]]:
+        """Fetch the full CDP neighbor table."""
         # Cisco-IOS-XE-cdp-oper:cdp-neighbor-details
         data = await self._request("GET", "/Cisco-IOS-XE-cdp-oper:cdp-neighbor-details")
-        # Filter for the specific interface
-        neighbors = jmespath.search('"Cisco-IOS-XE-cdp-oper:cdp-neighbor-details"."cdp-neighbor-detail"[]', data) or []
-        
+        return _dig(data, "Cisco-IOS-XE-cdp-oper:cdp-neighbor-details", "cdp-neighbor-detail", default=[])
+
+    @ttl_cache(ttl=30)
+    async def _get_lldp_table(self) -> List[Dict[str, Any]]:
+        """Fetch the full LLDP neighbor table."""
+        # Cisco-IOS-XE-lldp-oper:lldp-entries
+        data = await self._request("GET", "/Cisco-IOS-XE-lldp-oper:lldp-entries")
+        return _dig(data, "Cisco-IOS-XE-lldp-oper:lldp-entries", "lldp-entry", default=[])
+
+    async def get_cdp_neighbors(self, interface: str) -> List[Dict[str, Any]]:
+        """Get CDP neighbors for an interface."""
         # Filter by local interface name
-        interface_lower = interface.lower()
-        matched = []
-        for n in neighbors:
-            local_intf = n.get("local-intf-name", "").lower()
-            # Try exact match or normalized match
-            if local_intf == interface_lower or self.normalize_interface_name(local_intf).lower() == interface_lower:
-                matched.append(n)
-        return matched
+        return _neighbors_on(await self._get_cdp_table(), "local-intf-name", interface)
 
     async def get_lldp_neighbors(self, interface: str) -> List[Dict[str, Any]]:
         """Get LLDP neighbors for an interface."""
-        # Cisco-IOS-XE-lldp-oper:lldp-entries
-        data = await self._request("GET", "/Cisco-IOS-XE-lldp-oper:lldp-entries")
-        neighbors = jmespath.search('"Cisco-IOS-XE-lldp-oper:lldp-entries"."lldp-entry"[]', data) or []
-        
-        interface_lower = interface.lower()
-        matched = []
-        for n in neighbors:
-            local_intf = n.get("local-interface", "").lower()
-            if local_intf == interface_lower or self.normalize_interface_name(local_intf).lower() == interface_lower:
-                matched.append(n)
-        return matched
+        return _neighbors_on(await self._get_lldp_table(), "local-interface", interface)
 
     async def get_interface_details(self, interface: str) -> Dict[str, Any]:
         """Get detailed configuration for an interface."""
-        import re
-        match = re.match(r"([A-Za-z]+)([\d/.]+)", interface)
+        match = _IFACE_RE.match(interface)
         if not match:
             return {}
         
@@ -131,9 +518,9 @@ class C3850Device:
         
         try:
             # Encode the interface name (e.g. 1/0/2 -> 1%2F0%2F2)
-            encoded_name = quote(if_name, safe='')
+            encoded_name = self._enc(if_name)
             path = f"/Cisco-IOS-XE-native:native/interface/{if_type}={encoded_name}"
-            data = await self._request("GET", path)
+            data = await self._request("GET", path, conditional=True)
             key = f"Cisco-IOS-XE-native:{if_type}"
             return data.get(key, {})
         except Exception:
@@ -143,12 +530,13 @@ class C3850Device:
         """Returns a risk assessment for an interface."""
         full_name = self.normalize_interface_name(interface)
         
-        # Get details
-        config = await self.get_interface_details(full_name)
-        status_list = await self.get_interfaces_status(status_filter=full_name)
-        status = status_list[0] if status_list else {}
-        cdp_data = await self.get_cdp_neighbors(full_name)
-        lldp_data = await self.get_lldp_neighbors(full_name)
+        # Get details; the four lookups are independent, so fetch them concurrently
+        config, status, cdp_data, lldp_data = await asyncio.gather(
+            self.get_interface_details(full_name),
+            self._first_interface_status(full_name),
+            self.get_cdp_neighbors(full_name),
+            self.get_lldp_neighbors(full_name),
+        )
         
         risk_level = "LOW"
         warnings = []
@@ -182,7 +570,7 @@ class C3850Device:
         # Check 4: Is it already down?
         # If we are analyzing impact of a change, knowing it's down is useful.
         # If it's admin down, changing it (unless bringing it up) has low impact.
-        if status.get("admin_status") == "down":
+        if status is not None and status.admin_status == "down":
              risk_level = "ZERO"
              warnings.append("Interface is already administratively down.")
         
@@ -226,42 +614,130 @@ class C3850Device:
             ]
         }
 
-    async def _request(self, method: str, path: str, json: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make an HTTP request to the device."""
-        async with self.semaphore:
-            if self.http_client:
-                response = await self.http_client.request(
-                    method,
-                    f"{self.base_url}{path}",
-                    auth=self.auth,
-                    headers=self.headers,
-                    json=json,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                if response.status_code == 204:
-                    return {}
-                return response.json()
-            
-            async with httpx.AsyncClient(verify=False) as client:
-                response = await client.request(
-                    method,
-                    f"{self.base_url}{path}",
-                    auth=self.auth,
-                    headers=self.headers,
-                    json=json,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                if response.status_code == 204:
-                    return {}
-                return response.json()
-
-    async def get_interfaces_status(self, status_filter: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get status of all interfaces."""
+    async def _request(self, method: str, path: str, json: Optional[Dict] = None, conditional: bool = False,
+                       content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Make an HTTP request to the device.
+
+        With conditional=True a GET revalidates the last body seen for this path
+        via If-None-Match; a 304 reuses it without transferring or parsing it again.
+        Meant for slow-changing config/oper subtrees; callers must not mutate the result.
+        content_type overrides the default yang-data+json body type (e.g. for YANG-Patch).
+        """
+        headers = self.headers
+        cached = self._etags.get(path) if conditional and method == "GET" else None
+        if cached:
+            headers = {**self.headers, "If-None-Match": cached[0]}
+        if content_type:
+            headers = {**headers, "Content-Type": content_type}
+
+        async with self._request_slots:
+            response = await self._get_client().request(
+                method,
+                # base_url would add a trailing slash to the bare datastore root, so send that one in full
+                self._url_prefix + path if path else self.base_url,
+                headers=headers,
+                # Serialize ourselves: orjson hands back bytes, skipping httpx's stdlib dumps + encode
+                content=jsonutil.dumps_bytes(json) if json is not None else None,
+                **self._req_kwargs,
+            )
+        if method != "GET":
+            # Any write may change interface state or VLANs; don't serve stale reads
+            self._iface_cache.clear()
+            for cache_attr in _WRITE_INVALIDATED_CACHES:
+                self.__dict__.pop(cache_attr, None)
+        if cached and response.status_code == 304:
+            return cached[1]
+        content = response.content
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            # IOS-XE explains rejections in a small ietf-restconf:errors body; keep it in the message
+            detail = content[:512].decode("utf-8", errors="replace")
+            raise httpx.HTTPStatusError(f"{e}\n{detail}" if detail else str(e), request=e.request, response=e.response) from None
+        # 204 No Content, or a 200/201 with an empty body (IOS-XE does this for some writes)
+        if response.status_code == 204 or not content:
+            return {}
+        data = jsonutil.loads(content)
+        etag = response.headers.get("ETag")
+        if conditional and method == "GET" and etag:
+            self._etags[path] = (etag, data)
+        return data
+
+    async def get_interfaces_status(self, status_filter: Optional[str] = None, fields: Optional[Sequence[str]] = None) -> List[InterfaceStatus]:
+        """Get status of all interfaces.
+
+        Args:
+            status_filter: Optional. 'up', 'down', 'connected', 'not connected', or an interface name.
+            fields: Optional. YANG leaves to fetch (default DEFAULT_IFACE_FIELDS). Leaves that
+                    aren't requested are left empty, and the config GET is skipped entirely
+                    when neither 'description' nor 'admin-status' is asked for.
+
+        Results are reused for IFACE_STATUS_TTL seconds so pre/post checks in the
+        same run don't refetch; any write through this device clears the cache.
+        Equivalent filters ('UP' and 'up', 'Gi1/0/1' and 'GigabitEthernet1/0/1')
+        share one entry.
+        """
+        status_filter = _canonical_filter(status_filter)
+        fields = tuple(fields) if fields else DEFAULT_IFACE_FIELDS
+        key = (status_filter, fields)
+        cached = self._iface_cache.get(key)
+        if cached and time.monotonic() - cached[0] < IFACE_STATUS_TTL:
+            return list(cached[1])
+
+        interfaces = [i async for i in self._fetch_interfaces_status(status_filter, fields)]
+        self._iface_cache[key] = (time.monotonic(), interfaces)
+        return list(interfaces)
+
+    async def iter_interfaces_status(self, status_filter: Optional[str] = None, fields: Optional[Sequence[str]] = None) -> AsyncIterator[InterfaceStatus]:
+        """Yield interface status rows one at a time so callers can stop early.
+
+        Takes the same arguments as get_interfaces_status(). A fresh cached result
+        is replayed; otherwise rows are built as they are walked and not cached,
+        since a caller that breaks early never sees the full list.
+        """
+        status_filter = _canonical_filter(status_filter)
+        fields = tuple(fields) if fields else DEFAULT_IFACE_FIELDS
+        cached = self._iface_cache.get((status_filter, fields))
+        if cached and time.monotonic() - cached[0] < IFACE_STATUS_TTL:
+            for iface in cached[1]:
+                yield iface
+            return
+
+        async for iface in self._fetch_interfaces_status(status_filter, fields):
+            yield iface
+
+    async def _first_interface_status(self, interface: str) -> Optional[InterfaceStatus]:
+        """Return the first status row matching interface, without building the rest."""
+        async with aclosing(self.iter_interfaces_status(status_filter=interface)) as rows:
+            async for row in rows:
+                return row
+        return None
+
+    def _interface_field_selectors(self, status_filter: Optional[str], fields: Sequence[str]) -> Tuple[str, Optional[str]]:
+        """Build the RESTCONF 'fields=' leaf lists for the state and config trees.
+
+        Returns (state_leaves, config_leaves); config_leaves is None when no config
+        leaf is needed and the config GET can be skipped.
+        """
+        unknown = set(fields) - set(DEFAULT_IFACE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported interface field(s): {', '.join(sorted(unknown))}")
+
+        state = [f for f in IFACE_STATE_LEAVES if f in fields or f == "name"]
+        if status_filter and status_filter.lower() in _STATUS_KEYWORDS and "oper-status" not in state:
+            state.append("oper-status")
+
+        wanted = {_CONFIG_LEAF_FOR[f] for f in fields if f in _CONFIG_LEAF_FOR}
+        config = [leaf for leaf in IFACE_CONFIG_LEAVES if leaf in wanted or leaf == "name"]
+
+        return ";".join(state), (";".join(config) if wanted else None)
+
+    async def _fetch_interfaces_status(self, status_filter: Optional[str] = None, fields: Sequence[str] = DEFAULT_IFACE_FIELDS) -> AsyncIterator[InterfaceStatus]:
+        """Fetch interface state and config from the device and yield merged rows."""
+        state_fields, config_fields = self._interface_field_selectors(status_filter, fields)
         
         # Optimization: If status_filter is a specific interface, fetch only that one.
-        if status_filter and status_filter.lower() not in ["up", "down", "connected", "not connected"]:
+        if status_filter and status_filter.lower() not in _STATUS_KEYWORDS:
             normalized_filter = self.normalize_interface_name(status_filter)
             # Check if it looks like a full interface name (starts with known type)
             # normalize_interface_name expands prefixes, so if it starts with a known type, it's likely a full name.
@@ -270,16 +746,20 @@ class C3850Device:
             # Simple check: does it start with an uppercase letter? normalize_interface_name returns TitleCase.
             # And does it contain numbers?
             if any(normalized_filter.startswith(x) for x in ["TenGigabitEthernet", "GigabitEthernet", "FastEthernet", "Vlan", "Loopback", "Port-channel"]):
-                 from urllib.parse import quote
-                 encoded_name = quote(normalized_filter, safe='')
+                 encoded_name = self._enc(normalized_filter)
+                 row = None
                  
                  try:
-                     # Fetch state
-                     state_data = await self._request("GET", f"/ietf-interfaces:interfaces-state/interface={encoded_name}")
+                     # Fetch state and config concurrently
+                     state_data, config_data = await asyncio.gather(
+                         self._request("GET", f"/ietf-interfaces:interfaces-state/interface={encoded_name}?fields={state_fields}"),
+                         self._request("GET", f"/ietf-interfaces:interfaces/interface={encoded_name}?fields={config_fields}") if config_fields else _no_data(),
+                         return_exceptions=True,
+                     )
+                     for result in (state_data, config_data):
+                         if isinstance(result, Exception):
+                             raise result
                      iface_state = state_data.get("ietf-interfaces:interface", {})
-                     
-                     # Fetch config
-                     config_data = await self._request("GET", f"/ietf-interfaces:interfaces/interface={encoded_name}")
                      iface_config = config_data.get("ietf-interfaces:interface", {})
                      
                      if iface_state:
@@ -288,59 +768,75 @@ class C3850Device:
                          if "enabled" in iface_config:
                              admin_status = "up" if iface_config["enabled"] else "down"
 
-                         return [{
-                            "name": iface_state.get("name"),
-                            "description": iface_config.get("description", ""),
-                            "admin_status": admin_status,
-                            "oper_status": iface_state.get("oper-status"),
-                            "speed": iface_state.get("speed"),
-                            "mac": iface_state.get("phys-address")
-                         }]
+                         row = InterfaceStatus(
+                            name=iface_state.get("name"),
+                            description=iface_config.get("description", ""),
+                            admin_status=admin_status,
+                            oper_status=iface_state.get("oper-status"),
+                            speed=iface_state.get("speed"),
+                            mac=iface_state.get("phys-address")
+                         )
                  except Exception:
                      # If specific fetch fails (e.g. 404), fall back to full fetch
                      pass
 
-        # ietf-interfaces:interfaces-state
-        data = await self._request("GET", "/ietf-interfaces:interfaces-state")
+                 if row is not None:
+                     yield row
+                     return
+
+        # ietf-interfaces:interfaces-state, plus config for descriptions, fetched concurrently
+        data, config_data = await asyncio.gather(
+            self._request("GET", f"/ietf-interfaces:interfaces-state?fields=interface({state_fields})"),
+            self._request("GET", f"/ietf-interfaces:interfaces?fields=interface({config_fields})") if config_fields else _no_data(),
+            return_exceptions=True,
+        )
+        if isinstance(data, Exception):
+            raise data
         
-        # Use JMESPath to extract interfaces
-        interfaces = jmespath.search('"ietf-interfaces:interfaces-state".interface[]', data) or []
+        # Extract the interface list
+        interfaces = _dig(data, "ietf-interfaces:interfaces-state", "interface", default=[])
+
+        # A filter that names one interface exactly gets just that interface, as the
+        # fast path above would have returned; one dict probe instead of a substring scan
+        if status_filter and status_filter.lower() not in _STATUS_KEYWORDS:
+            index_by_name = {i.get("name", "").lower(): i for i in interfaces}
+            exact = index_by_name.get(self.normalize_interface_name(status_filter).lower())
+            if exact is not None:
+                interfaces = [exact]
         
-        # Fetch config to get descriptions
-        try:
-            config_data = await self._request("GET", "/ietf-interfaces:interfaces")
-            config_interfaces = jmespath.search('"ietf-interfaces:interfaces".interface[]', config_data) or []
-            config_map = {i.get("name"): i for i in config_interfaces}
-        except Exception:
-            # Fallback if config fetch fails
-            config_map = {}
+        # Fallback if config fetch fails: statuses are still returned, just without descriptions
+        config_map = {}
+        if not isinstance(config_data, Exception):
+            config_map = {
+                i["name"]: i
+                for i in _dig(config_data, "ietf-interfaces:interfaces", "interface", default=[])
+                if "name" in i
+            }
+
+        # Resolve the filter once, not per interface; at most one of these is set
+        f_lower = status_filter.lower() if status_filter else None
+        wanted_oper = f_lower if f_lower in ("up", "down") else None
+        # Connected means oper-status is up; not connected is anything else (down, lower-layer-down, etc)
+        want_connected = {"connected": True, "not connected": False}.get(f_lower)
+        name_substr = None
+        if f_lower and wanted_oper is None and want_connected is None:
+            # Normalize the filter to match full interface names
+            name_substr = self.normalize_interface_name(status_filter)
 
-        simplified_interfaces = []
+        config_map_get = config_map.get
         for iface in interfaces:
             name = iface.get("name")
             oper_status = iface.get("oper-status")
-            
-            # Apply filter if present
-            if status_filter:
-                f_lower = status_filter.lower()
-                if f_lower in ["up", "down"]:
-                    if oper_status != f_lower:
-                        continue
-                elif f_lower == "connected":
-                    # Connected means oper-status is up
-                    if oper_status != "up":
-                        continue
-                elif f_lower == "not connected":
-                    # Not connected means oper-status is not up (down, lower-layer-down, etc)
-                    if oper_status == "up":
-                        continue
-                else:
-                    # Normalize the filter to match full interface names
-                    normalized_filter = self.normalize_interface_name(status_filter)
-                    if normalized_filter not in name:
-                        continue
 
-            config = config_map.get(name, {})
+            # Skip filtered-out interfaces before any config lookup or row construction
+            if wanted_oper is not None and oper_status != wanted_oper:
+                continue
+            if want_connected is not None and (oper_status == "up") != want_connected:
+                continue
+            if name_substr is not None and name_substr not in name:
+                continue
+
+            config = config_map_get(name) or _EMPTY
             
             # Derive admin_status from config 'enabled' if available, otherwise fallback to state
             # This handles cases where state might be out of sync or misleading
@@ -348,21 +844,21 @@ class C3850Device:
             if "enabled" in config:
                 admin_status = "up" if config["enabled"] else "down"
             
-            simplified_interfaces.append({
-                "name": name,
-                "description": config.get("description", ""),
-                "admin_status": admin_status,
-                "oper_status": oper_status,
-                "speed": iface.get("speed"),
-                "mac": iface.get("phys-address")
-            })
-        return simplified_interfaces
+            yield InterfaceStatus(
+                name=name,
+                description=config.get("description", ""),
+                admin_status=admin_status,
+                oper_status=oper_status,
+                speed=iface.get("speed"),
+                mac=iface.get("phys-address")
+            )
 
+    @ttl_cache(ttl=15, invalidate_on_write=True)
     async def get_vlan_brief(self) -> List[Dict[str, Any]]:
         """Get VLAN information."""
         # Cisco-IOS-XE-vlan-oper:vlan-oper-data
-        data = await self._request("GET", "/Cisco-IOS-XE-vlan-oper:vlan-oper-data")
-        vlans = jmespath.search('"Cisco-IOS-XE-vlan-oper:vlan-oper-data"."vlan-instance"[]', data) or []
+        data = await self._request("GET", "/Cisco-IOS-XE-vlan-oper:vlan-oper-data", conditional=True)
+        vlans = _dig(data, "Cisco-IOS-XE-vlan-oper:vlan-oper-data", "vlan-instance", default=[])
         
         simplified_vlans = []
         for vlan in vlans:
@@ -370,44 +866,76 @@ class C3850Device:
                 "id": vlan.get("id"),
                 "name": vlan.get("name"),
                 "status": vlan.get("status", "active"), # Default to active if not present
-                "ports": jmespath.search("ports[].interface", vlan) or []
+                "ports": [p["interface"] for p in vlan.get("ports") or [] if p.get("interface") is not None]
             })
         return simplified_vlans
 
+    @ttl_cache(ttl=30)
     async def get_system_summary(self) -> Dict[str, Any]:
         """Get system summary."""
         # Cisco-IOS-XE-native:native/version
-        data = await self._request("GET", "/Cisco-IOS-XE-native:native/version")
-        version = jmespath.search('"Cisco-IOS-XE-native:version".version', data)
-        return {
-            "version": version,
-            "platform": "Cisco 3850", # Hardcoded as we know the device type or could extract
-            "uptime": "Unknown" # Uptime usually in a different model, keeping simple for now
-        }
+        data = await self._request("GET", "/Cisco-IOS-XE-native:native/version", conditional=True)
+        version = _dig(data, "Cisco-IOS-XE-native:version", "version")
+        return {"version": version, **_SYS_CONST}
     
     @ttl_cache(ttl=60)
     async def get_transceiver_stats(self) -> Dict[str, Any]:
         """Get transceiver statistics."""
         # Note: Specific YANG model for transceiver stats might vary, using a generic interface query for now
         # or assuming a specific model if known. For now, we'll try to get interface details which often contain this.
-        return await self._request("GET", "/Cisco-IOS-XE-interfaces-oper:interfaces/interface")
+        # Project on the switch so only the counters cross the wire and get parsed
+        return await self._request("GET", f"/Cisco-IOS-XE-interfaces-oper:interfaces/interface?fields={';'.join(TRANSCEIVER_FIELDS)}")
 
-    async def get_device_health(self) -> Dict[str, Any]:
-        """Get device health (CPU, Memory, Environment)."""
+    async def get_cpu(self) -> Any:
+        """Get 5-second CPU utilization (percent)."""
         cpu_data = await self._request("GET", "/Cisco-IOS-XE-process-cpu-oper:cpu-usage")
+        return _dig(cpu_data, "Cisco-IOS-XE-process-cpu-oper:cpu-usage", "cpu-utilization", "five-seconds")
+
+    async def get_memory(self) -> str:
+        """Get a memory usage summary."""
         mem_data = await self._request("GET", "/Cisco-IOS-XE-process-memory-oper:memory-usage-processes")
-        
-        cpu_usage = jmespath.search('"Cisco-IOS-XE-process-cpu-oper:cpu-usage"."cpu-utilization"."five-seconds"', cpu_data)
-        
         # Simplified memory calculation
-        memory_usage = "Unknown" 
-        if jmespath.search('"Cisco-IOS-XE-process-memory-oper:memory-usage-processes"', mem_data):
-             memory_usage = "Check details"
+        # Presence check only: one dict lookup, without walking into the subtree
+        if mem_data.get("Cisco-IOS-XE-process-memory-oper:memory-usage-processes"):
+            return "Check details"
+        return "Unknown"
+
+    # Sensor states change slowly; lets every health check within a minute share one fetch
+    @ttl_cache(ttl=60)
+    async def get_environment(self) -> str:
+        """Summarize environment sensors (temperature, power, fans) by state."""
+        data = await self._request("GET", "/Cisco-IOS-XE-environment-oper:environment-sensors?fields=environment-sensor(name;location;state)")
+        sensors = _dig(data, "Cisco-IOS-XE-environment-oper:environment-sensors", "environment-sensor", default=[])
+        if not sensors:
+            return "Unknown"
+        abnormal = [f"{s.get('location', '?')} {s.get('name', '?')}: {s.get('state')}"
+                    for s in sensors if str(s.get("state", "")).lower() not in ("normal", "good", "ok")]
+        if not abnormal:
+            return f"All {len(sensors)} sensors normal"
+        return "Check: " + "; ".join(abnormal)
+
+    @ttl_cache(ttl=10)
+    async def get_device_health(self) -> Dict[str, Any]:
+        """Get device health (CPU, Memory, Environment)."""
+        # Independent subtrees: one round-trip of latency instead of three
+        cpu_usage, memory_usage, environment = await asyncio.gather(
+            self.get_cpu(), self.get_memory(), self.get_environment(), return_exceptions=True
+        )
+        for outcome in (cpu_usage, memory_usage, environment):
+            # Cancellation (and other non-Exception BaseExceptions) must propagate, never become a value
+            if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                raise outcome
+        for outcome in (cpu_usage, memory_usage):
+            if isinstance(outcome, Exception):
+                raise outcome
+        # Not every platform/release has the environment model; health is still useful without it
+        if isinstance(environment, Exception):
+            environment = "Unknown"
 
         return {
             "cpu_usage_percent": cpu_usage,
             "memory_usage": memory_usage,
-            "environment_summary": "Check details" # Simplifying for now
+            "environment_summary": environment,
         }
 
     async def get_recent_logs(self, count: int = 50, search_term: Optional[str] = None) -> Dict[str, Any]:
@@ -415,121 +943,54 @@ class C3850Device:
         
         Args:
             count: Number of log lines to retrieve (default 50).
-            search_term: Optional. Filter logs by this term (case-insensitive).
+            search_term: Optional. Filter logs by this term (case-insensitive). Matches come back
+                under 'filtered_logs' as 'path: value' strings, one per matching leaf.
         """
-        # Cisco-IOS-XE-checkpoint-archive-oper:checkpoint-archives
-        # Note: Syslog via RESTCONF is not always straightforward. 
-        # We might need to rely on a specific operational model if available.
-        # Fallback to native logging config if operational data isn't exposed.
-        # The count parameter is accepted but not used in this RESTCONF query
-        # as the YANG model doesn't support limiting results.
-        data = await self._request("GET", "/Cisco-IOS-XE-native:native/logging")
-        
-        # If data is a dict (which it likely is from _request), we need to extract something iterable if possible.
-        # However, /Cisco-IOS-XE-native:native/logging usually returns configuration, not actual logs.
-        # Actual logs are often in /Cisco-IOS-XE-logging:logging-events or similar if supported.
-        # For this exercise, assuming 'data' contains a list of log entries or we are filtering the raw response structure.
-        # If the response is just config, filtering might not make sense, but let's assume we want to filter whatever we get.
-        
-        # If we can't parse it as a list of strings, we might just return it as is if no search_term.
-        # But the user wants filtering.
-        # Let's assume for a moment that 'data' might contain a list under some key, or we just filter the string representation if it's unstructured.
-        
-        # Realistically, if we are just returning the config, we can filter the config keys/values?
-        # Or maybe the user implies we should be fetching actual logs.
-        # Given the prompt "Retrieving 'Last 50' logs often returns 50 lines of useless clutter", 
-        # it implies we ARE getting logs.
-        # So let's assume the previous implementation was returning something list-like or string-like.
-        # The previous implementation returned: return await self._request("GET", "/Cisco-IOS-XE-native:native/logging")
-        # If that returns a dict, we can't easily "filter lines".
-        
-        # Let's try to be smart. If it's a dict, we convert to string and filter lines?
-        # Or maybe we assume the user has a way to get logs and we just implement the filtering logic on the result.
-        
-        # Let's implement a generic filter on the result.
-        import json
-        
-        # If it's a dict, maybe we can flatten it to lines?
-        # For now, let's assume we want to filter the text representation of the JSON.
-        
+        # RESTCONF exposes the native logging subtree rather than a syslog buffer, and the model
+        # can't limit results, so count is accepted but not applied
+        data = await self._request("GET", "/Cisco-IOS-XE-native:native/logging", conditional=True)
         if not search_term:
             return data
-            
-        # If search_term is provided, we need to filter.
-        # Since we don't know the exact structure of the logs (as it was just returning config before),
-        # let's try to filter the JSON output line by line if we were to dump it.
-        # Or better, if the data is a list (which would be ideal for logs), filter the list.
-        
+
+        needle = search_term.lower()
         if isinstance(data, list):
-             return [item for item in data if search_term.lower() in str(item).lower()]
-        
-        # If it's a dict, it's harder.
-        # Maybe we just return the whole thing if we can't filter easily, or we filter keys?
-        # The user example showed: logs = [line for line in raw_logs if search_term.lower() in line.lower()]
-        # This implies raw_logs is a list of strings.
-        
-        # Let's assume for the sake of the requested change that we might be getting a list, 
-        # or we can convert the dict to a list of lines (e.g. JSON dump lines) and filter those?
-        # That changes the return type from Dict to List[str] potentially.
-        # The return type hint says Dict[str, Any].
-        
-        # Let's stick to the user's request: "Add a search_term parameter to filter server-side".
-        # I will implement a best-effort filter.
-        
+            return [item for item in data if needle in str(item).lower()]
         if isinstance(data, dict):
-            # If it's a dict, maybe we filter the keys or values?
-            # Or maybe we just return it if we can't filter.
-            # But the user specifically wants to filter "clutter".
-            # Let's try to filter the string representation of the dict entries?
-            # This is tricky without knowing the exact structure.
-            # But let's assume the user knows what they are doing and expects us to filter *something*.
-            
-            # If we assume the response is a list of log objects wrapped in a dict key:
-            # e.g. {"logging": {"events": [...]}}
-            # We could try to find a list and filter it.
-            
-            # For now, let's implement a recursive search/filter? No, that's too complex.
-            # Let's try to convert to string, split by lines, filter, and return as a list of strings?
-            # That changes the return type, but `get_recent_logs` in server.py converts result to str anyway.
-            
-            text = json.dumps(data, indent=2)
-            lines = text.splitlines()
-            filtered_lines = [line for line in lines if search_term.lower() in line.lower()]
-            return {"filtered_logs": filtered_lines}
-
+            # Walk the leaves directly instead of dumping the whole tree to text first
+            return {"filtered_logs": [line for line in _walk_strings(data) if needle in line.lower()]}
         return data
 
+    @ttl_cache(ttl=5, invalidate_on_write=True)
     async def check_interface_errors(self) -> Dict[str, Any]:
         """Check for interface errors."""
         return await self._request("GET", "/ietf-interfaces:interfaces-state")
 
+    def _native_interface_key(self, interface: str) -> Tuple[Optional[str], Optional[str]]:
+        """Split a full interface name into the IOS-XE native (type, name) list key, e.g. ('GigabitEthernet', '1/0/1')."""
+        match = _IFACE_RE.match(interface)
+        if match and match.group(1) in _NATIVE_INTERFACE_TYPES:
+            return match.group(1), match.group(2)
+        return None, None
+
     async def set_interface_state(self, interface: str, state: str) -> Dict[str, Any]:
-        """Set interface state (up/down)."""
+        """Set interface state (up/down).
+
+        With write_batch_window set, the change is held briefly and written together with
+        any others arriving meanwhile (see InterfaceStateBatcher).
+        """
+        if self._state_batcher is not None:
+            return await self._state_batcher.submit(interface, state)
+        return await self._apply_interface_state(interface, state)
+
+    async def _apply_interface_state(self, interface: str, state: str) -> Dict[str, Any]:
+        """Write one interface's state to the native and IETF models."""
         interface = self.normalize_interface_name(interface)
-        from urllib.parse import quote
         
         # Determine type and name for native model
-        if_type = None
-        if_name = None
-        
-        if "TenGigabitEthernet" in interface:
-            if_type = "TenGigabitEthernet"
-            if_name = interface.replace("TenGigabitEthernet", "")
-        elif "GigabitEthernet" in interface:
-            if_type = "GigabitEthernet"
-            if_name = interface.replace("GigabitEthernet", "")
-        elif "FastEthernet" in interface:
-            if_type = "FastEthernet"
-            if_name = interface.replace("FastEthernet", "")
-        elif "FortyGigabitEthernet" in interface:
-            if_type = "FortyGigabitEthernet"
-            if_name = interface.replace("FortyGigabitEthernet", "")
-        elif "Vlan" in interface:
-            if_type = "Vlan"
-            if_name = interface.replace("Vlan", "")
+        if_type, if_name = self._native_interface_key(interface)
             
         if if_type and if_name:
-            encoded_name = quote(if_name, safe='')
+            encoded_name = self._enc(if_name)
             
             # Prepare IETF payload as well
             ietf_enabled = state.lower() == "up"
@@ -539,21 +1000,19 @@ class C3850Device:
                     "enabled": ietf_enabled
                 }
             }
-            encoded_interface = quote(interface, safe='')
+            encoded_interface = self._enc(interface)
             
+            # Native first, then IETF, one at a time: if the native write fails nothing has
+            # changed yet, and IOS-XE can deny concurrent writes to the running datastore
             if state.lower() == "up":
                 # To bring up:
-                # 1. DELETE native shutdown
-                try:
-                    await self._request("DELETE", f"/Cisco-IOS-XE-native:native/interface/{if_type}={encoded_name}/shutdown")
-                except Exception:
-                    pass
-                
+                # 1. DELETE native shutdown (a 404 just means it wasn't shut)
                 # 2. PATCH IETF enabled=true
-                return await self._request("PATCH", f"/ietf-interfaces:interfaces/interface={encoded_interface}", json=ietf_payload)
+                await self._clear_native_shutdown(f"/Cisco-IOS-XE-native:native/interface/{if_type}={encoded_name}/shutdown")
             else:
                 # To shut down:
                 # 1. PATCH native shutdown
+                # 2. PATCH IETF enabled=false
                 native_payload = {
                     f"Cisco-IOS-XE-native:{if_type}": {
                         "name": if_name,
@@ -561,9 +1020,7 @@ class C3850Device:
                     }
                 }
                 await self._request("PATCH", f"/Cisco-IOS-XE-native:native/interface/{if_type}={encoded_name}", json=native_payload)
-                
-                # 2. PATCH IETF enabled=false
-                return await self._request("PATCH", f"/ietf-interfaces:interfaces/interface={encoded_interface}", json=ietf_payload)
+            return await self._request("PATCH", f"/ietf-interfaces:interfaces/interface={encoded_interface}", json=ietf_payload)
         
         # Fallback to ietf-interfaces if unknown type
         enabled = state.lower() == "up"
@@ -573,22 +1030,65 @@ class C3850Device:
                 "enabled": enabled
             }
         }
-        encoded_interface = quote(interface, safe='')
+        encoded_interface = self._enc(interface)
         return await self._request("PATCH", f"/ietf-interfaces:interfaces/interface={encoded_interface}", json=payload)
 
+    async def set_interface_states(self, states: Dict[str, str]) -> Dict[str, Any]:
+        """Set many interfaces up/down with collection PATCHes instead of per-port calls.
+
+        Args:
+            states: Interface name -> 'up' or 'down'.
+
+        Mirrors set_interface_state(): shutdowns are written to the native model in one
+        PATCH, native shutdowns being cleared are DELETEd per port (there is no bulk
+        delete), and every port's IETF 'enabled' leaf is set in one PATCH, sent last so a
+        failed native write leaves the IETF side untouched.
+        """
+        states = {self.normalize_interface_name(name): state.lower() for name, state in states.items()}
+        if not states:
+            return {}
+
+        native_down: Dict[str, List[Dict[str, Any]]] = {}
+        native_up = []
+        for interface, state in states.items():
+            if_type, if_name = self._native_interface_key(interface)
+            if not (if_type and if_name):
+                continue
+            if state == "up":
+                native_up.append(f"/Cisco-IOS-XE-native:native/interface/{if_type}={self._enc(if_name)}/shutdown")
+            else:
+                native_down.setdefault(if_type, []).append({"name": if_name, "shutdown": [None]})
+
+        # As in set_interface_state, native writes land before the IETF one, one request at a time
+        if native_down:
+            await self._request("PATCH", "/Cisco-IOS-XE-native:native/interface", json={
+                "Cisco-IOS-XE-native:interface": native_down
+            })
+        for path in native_up:
+            await self._clear_native_shutdown(path)
+        return await self._request("PATCH", "/ietf-interfaces:interfaces", json={
+            "ietf-interfaces:interfaces": {
+                "interface": [{"name": name, "enabled": state == "up"} for name, state in states.items()]
+            }
+        })
+
+    async def _clear_native_shutdown(self, path: str) -> None:
+        """DELETE a native 'shutdown' leaf; a port that isn't shut has nothing to delete."""
+        try:
+            await self._request("DELETE", path)
+        except httpx.HTTPStatusError as e:
+            # RESTCONF reports the missing leaf as 404, or 409 data-missing
+            if e.response.status_code not in (404, 409):
+                raise
+
     async def set_interface_vlan(self, interface: str, vlan_id: int) -> Dict[str, Any]:
         """Set access VLAN for an interface."""
         # Cisco-IOS-XE-native:native/interface/GigabitEthernet={name}
         # Note: Interface type needs to be handled dynamically in a real scenario.
         # Assuming GigabitEthernet for simplicity or parsing the name.
         interface = self.normalize_interface_name(interface)
-        if "TenGigabitEthernet" in interface:
-            if_type = "TenGigabitEthernet"
-            if_name = interface.replace("TenGigabitEthernet", "")
-        elif "GigabitEthernet" in interface:
-            if_type = "GigabitEthernet"
-            if_name = interface.replace("GigabitEthernet", "")
-        else:
+        if_type, if_name = self._native_interface_key(interface)
+        if if_type not in ("TenGigabitEthernet", "GigabitEthernet"):
             raise ValueError("Unsupported interface type")
 
         payload = {
@@ -606,7 +1106,7 @@ class C3850Device:
                 }
             }
         }
-        encoded_name = quote(if_name, safe='')
+        encoded_name = self._enc(if_name)
         return await self._request("PATCH", f"/Cisco-IOS-XE-native:native/interface/{if_type}={encoded_name}", json=payload)
 
     async def set_vlan_name(self, vlan_id: int, name: str) -> Dict[str, Any]:
@@ -626,14 +1126,70 @@ class C3850Device:
         }
         return await self._request("PATCH", f"/Cisco-IOS-XE-native:native/vlan/vlan-list={vlan_id}", json=payload_config)
 
+    async def _patch_interface_state(self, interface: str, state: str) -> Dict[str, Any]:
+        """Apply set_interface_state's native and IETF edits as one YANG-Patch on the datastore root."""
+        up = state.lower() == "up"
+        encoded_interface = self._enc(interface)
+        edits = [{
+            "edit-id": "ietf",
+            "operation": "merge",
+            "target": f"/ietf-interfaces:interfaces/interface={encoded_interface}",
+            "value": {"ietf-interfaces:interface": [{"name": interface, "enabled": up}]},
+        }]
+        if_type, if_name = self._native_interface_key(interface)
+        if if_type and if_name:
+            target = f"/Cisco-IOS-XE-native:native/interface/{if_type}={self._enc(if_name)}"
+            if up:
+                # 'remove', unlike 'delete', doesn't fail when the port wasn't shut
+                edits.insert(0, {"edit-id": "native", "operation": "remove", "target": f"{target}/shutdown"})
+            else:
+                edits.insert(0, {
+                    "edit-id": "native",
+                    "operation": "merge",
+                    "target": target,
+                    "value": {f"Cisco-IOS-XE-native:{if_type}": [{"name": if_name, "shutdown": [None]}]},
+                })
+        payload = {"ietf-yang-patch:yang-patch": {"patch-id": f"{state.lower()}-{interface}", "edit": edits}}
+        return await self._request("PATCH", "", json=payload, content_type=YANG_PATCH_CONTENT_TYPE)
+
     async def bounce_interface(self, interface: str) -> Dict[str, Any]:
         """Bounce (shut/no shut) an interface."""
-        # RESTCONF doesn't have a "bounce" primitive, so we do two requests.
-        # Normalization happens in set_interface_state, but good to be explicit or just let it flow down.
-        # Since we call set_interface_state, it will normalize there.
-        # But wait, we need to pass the same normalized name to both calls to be safe/consistent?
-        # Actually set_interface_state normalizes it, so we can just pass the raw string.
-        # However, to be cleaner, let's normalize once here.
+        # RESTCONF doesn't have a "bounce" primitive. The shut and the no shut must be
+        # separate commits (one transaction would net out to no change), but each step's
+        # native + IETF edits can travel as a single YANG-Patch: two requests instead of four.
+        # The fallbacks call _apply_interface_state directly: the steps must not wait on, or be
+        # merged into, a write batch
         interface = self.normalize_interface_name(interface)
-        await self.set_interface_state(interface, "down")
-        return await self.set_interface_state(interface, "up")
+        if self._yang_patch_supported is not False:
+            try:
+                await self._patch_interface_state(interface, "down")
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                if status in _YANG_PATCH_UNSUPPORTED:
+                    self._yang_patch_supported = False
+                elif status != 400:
+                    raise
+                else:
+                    # A 400 may just be this payload, so fall back this once without giving up on YANG-Patch
+                    self._count_yang_patch_400()
+            else:
+                self._yang_patch_supported = True
+                try:
+                    result = await self._patch_interface_state(interface, "up")
+                except httpx.HTTPError as e:
+                    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 400:
+                        self._count_yang_patch_400()
+                    # The port is already shut; leaving it that way is the worst outcome of a bounce
+                    logger.warning("YANG-Patch re-enable of %s failed (%s); retrying with per-root writes", interface, e)
+                    return await self._apply_interface_state(interface, "up")
+                self._yang_patch_400s = 0
+                return result
+        await self._apply_interface_state(interface, "down")
+        return await self._apply_interface_state(interface, "up")
+
+    def _count_yang_patch_400(self) -> None:
+        """Record a YANG-Patch 400; enough in a row means the device, not one payload, is refusing them."""
+        self._yang_patch_400s += 1
+        if self._yang_patch_400s >= _YANG_PATCH_MAX_400S:
+            logger.warning("%d consecutive YANG-Patch 400s; using per-root writes from now on", self._yang_patch_400s)
+            self._yang_patch_supported = False
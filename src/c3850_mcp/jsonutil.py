@@ -0,0 +1,44 @@
+"""JSON helpers that use orjson when it is installed and fall back to the stdlib."""
+import json
+import dataclasses
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document (RESTCONF responses arrive as bytes)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(obj: Any) -> Any:
+    # orjson serializes dataclasses natively; teach the stdlib fallback the same
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize obj to a JSON string, optionally pretty-printed with two-space indents.
+
+    Dataclasses become objects and non-string dict keys (e.g. VLAN ids) become strings.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode()
+    if indent:
+        return json.dumps(obj, indent=2, default=_default)
+    # Match orjson's compact output; the default ', ' and ': ' separators only add bytes
+    return json.dumps(obj, separators=(",", ":"), default=_default)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes, ready to send as a request body."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
@@ -2,34 +2,47 @@
 import sys
 import os
 
-# Shim logging
-with open("/tmp/shim.log", "a") as f:
-    f.write(f"Starting with {sys.executable}\n")
-    f.write(f"Args: {sys.argv}\n")
-    f.write(f"CWD: {os.getcwd()}\n")
+# Shim logging: launch diagnostics for MCP clients that start us with the wrong interpreter.
+# Off unless C3850_SHIM_DEBUG is set, so normal starts don't touch /tmp at all.
+SHIM_DEBUG = bool(os.environ.get("C3850_SHIM_DEBUG"))
+_SHIM_FD = None
+
+def _shim_log(msg: str) -> None:
+    global _SHIM_FD
+    if not SHIM_DEBUG:
+        return
+    if _SHIM_FD is None:
+        _SHIM_FD = os.open("/tmp/shim.log", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    os.write(_SHIM_FD, msg.encode())
+
+_shim_log(f"Starting with {sys.executable}\nArgs: {sys.argv}\nCWD: {os.getcwd()}\n")
 
-# Force usage of venv python if available
 from pathlib import Path
 
-# Force usage of venv python if available
+# Force usage of venv python if available, for MCP clients that launch server.py with the wrong
+# interpreter. Opt-in via C3850_REEXEC_SHIM: the c3850-mcp entry point already runs in the right
+# environment, and re-exec'ing costs a second interpreter start and import of the whole stack.
 # This script is in src/c3850_mcp/server.py, so project root is 3 levels up
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 VENV_PYTHON = PROJECT_ROOT / ".venv" / "bin" / "python"
 
-if sys.executable != str(VENV_PYTHON) and VENV_PYTHON.exists():
-    with open("/tmp/shim.log", "a") as f:
-        f.write(f"Re-executing with {VENV_PYTHON}\n")
+if os.environ.get("C3850_REEXEC_SHIM") and sys.executable != str(VENV_PYTHON) and VENV_PYTHON.exists():
+    _shim_log(f"Re-executing with {VENV_PYTHON}\n")
     # Re-execute with the correct interpreter
     try:
         os.execv(str(VENV_PYTHON), [str(VENV_PYTHON)] + sys.argv)
     except Exception as e:
-        with open("/tmp/shim.log", "a") as f:
-            f.write(f"Execv failed: {e}\n")
+        _shim_log(f"Execv failed: {e}\n")
 
 
 import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
+import time
 import httpx
+from collections import OrderedDict
 from dotenv import load_dotenv
 from typing import Any, Dict, List, Optional
 
@@ -39,68 +52,145 @@ load_dotenv()
 from mcp.server.fastmcp import FastMCP, Context
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 
+from c3850_mcp import aio, jsonutil
 from c3850_mcp.device import C3850Device
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename="/tmp/mcp_server_prod.log",
-    filemode="a",
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure logging. Records are queued in memory and written to disk by a listener thread,
+# so logging from a tool (or httpx's DEBUG chatter) never blocks the event loop on file I/O.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_file_handler = logging.FileHandler("/tmp/mcp_server_prod.log", mode="a")
+_log_file_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler)
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# The queue handler only merges args into the message; the file handler applies the real format
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.DEBUG, handlers=[_log_queue_handler])
+_log_listener.start()
+# Flush whatever is still queued on the way out
+atexit.register(_log_listener.stop)
 logger = logging.getLogger("c3850-mcp-server")
 
 from contextlib import asynccontextmanager
 from functools import wraps
 
-def tool_error_handler(func):
+def mcp_tool_with_errors():
+    """Register func as an MCP tool whose exceptions come back as messages for the LLM.
+
+    One wrapper layer does both jobs, instead of @mcp.tool() stacked on a separate error handler.
+    """
+    def outer(func):
+        @mcp.tool()
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except httpx.HTTPStatusError as e:
+                # Handle 401/403/404 specifically for the LLM
+                return f"⚠️ Network Error {e.response.status_code}: {e.response.text}"
+            except httpx.RequestError as e:
+                # Handle connection timeouts, refused connections, etc.
+                return f"⚠️ Device Communication Error: {str(e)}"
+            except Exception as e:
+                logger.error("Critical error in %s: %s", func.__name__, e)
+                return f"❌ Internal Tool Error: {str(e)}"
+        return inner
+    return outer
+
+def _serialize(result: Any) -> str:
+    """Render a tool result as JSON, which the LLM parses more reliably than a Python repr.
+
+    Strings are already text and pass through as-is rather than gaining JSON quotes.
+    """
+    if isinstance(result, str):
+        return result
+    return jsonutil.dumps(result)
+
+# Read tool calls currently running, keyed by (tool name, arguments)
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+def single_flight(func):
+    """Let concurrent identical calls of a read-only tool share one execution.
+
+    Only for reads: two identical writes (e.g. two bounces) are meant to happen twice.
+    """
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        try:
-            return await func(*args, **kwargs)
-        except httpx.HTTPStatusError as e:
-            # Handle 401/403/404 specifically for the LLM
-            return f"⚠️ Network Error {e.response.status_code}: {e.response.text}"
-        except httpx.RequestError as e:
-            # Handle connection timeouts, refused connections, etc.
-            return f"⚠️ Device Communication Error: {str(e)}"
-        except Exception as e:
-            logger.error(f"Critical error in {func.__name__}: {e}")
-            return f"❌ Internal Tool Error: {str(e)}"
-            return f"❌ Internal Tool Error: {str(e)}"
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        task = _inflight.get(key)
+        if task is None:
+            task = _inflight[key] = asyncio.ensure_future(func(*args, **kwargs))
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the call for the others
+        return await asyncio.shield(task)
     return wrapper
 
+_SAFE_TEMPLATE = (
+    "ℹ️ ANALYSIS: {iface} is already in a safe state (e.g., down). No impact. Call with confirm=True to proceed."
+)
+_BLAST_TEMPLATE = (
+    "⛔ STOP! BLAST RADIUS ANALYSIS for {iface}:\n"
+    "Risk Level: {risk}\n"
+    "Warnings:\n{warnings}\n\n"
+    "ACTION REQUIRED: Explain these risks to the user. "
+    "Do not proceed until the user explicitly approves 'confirm=True'."
+)
+
 def format_blast_radius_report(impact: Dict[str, Any]) -> str:
     """Format the blast radius analysis report."""
+    iface = impact.get('interface', 'Target')
     if impact['risk_level'] == "ZERO":
-        return f"ℹ️ ANALYSIS: {impact.get('interface', 'Target')} is already in a safe state (e.g., down). No impact. Call with confirm=True to proceed."
-    
-    warnings = "\n".join([f"- {w}" for w in impact['warnings']])
-    return (
-        f"⛔ STOP! BLAST RADIUS ANALYSIS for {impact.get('interface', 'Target')}:\n"
-        f"Risk Level: {impact['risk_level']}\n"
-        f"Warnings:\n{warnings}\n\n"
-        f"ACTION REQUIRED: Explain these risks to the user. "
-        f"Do not proceed until the user explicitly approves 'confirm=True'."
-    )
-
-# Global client storage
-http_client = None
+        return _SAFE_TEMPLATE.format(iface=iface)
+
+    # One join with the bullet in the separator, instead of a list of f-strings
+    warnings = "- " + "\n- ".join(impact['warnings']) if impact['warnings'] else ""
+    return _BLAST_TEMPLATE.format(iface=iface, risk=impact['risk_level'], warnings=warnings)
+
+# Global device storage
 device = None
+# get_capabilities() is static per device session; serialized once on first use
+_capabilities: Optional[str] = None
+
+# Recent blast-radius analyses, so re-asking about the same target within the TTL is free
+IMPACT_CACHE_TTL = 30.0
+IMPACT_CACHE_SIZE = 64
+_impact_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+async def cached_impact(key: tuple, analyze) -> Dict[str, Any]:
+    """Return the analysis cached under key, or run analyze() and cache it (LRU, IMPACT_CACHE_TTL)."""
+    now = time.monotonic()
+    entry = _impact_cache.get(key)
+    if entry is not None and entry[0] > now:
+        _impact_cache.move_to_end(key)
+        return entry[1]
+    impact = await analyze()
+    _impact_cache[key] = (now + IMPACT_CACHE_TTL, impact)
+    _impact_cache.move_to_end(key)
+    if len(_impact_cache) > IMPACT_CACHE_SIZE:
+        _impact_cache.popitem(last=False)
+    return impact
 
 @asynccontextmanager
 async def server_lifespan(server: FastMCP):
-    global http_client, device
-    # Verify=False is usually needed for self-signed Cisco certs
-    # Limits are key here - Cisco httpd creates a new process per request
-    limits = httpx.Limits(max_keepalive_connections=5, max_connections=10)
-    http_client = httpx.AsyncClient(verify=False, limits=limits)
-    device = C3850Device(http_client=http_client)
+    global device, _capabilities
+    # The device builds its own pooled client: verify=False for self-signed Cisco certs, in-flight
+    # requests capped at C3850_MAX_CONCURRENCY (Cisco httpd creates a new process per request), keep-alive
+    # long enough to span successive tool calls, HTTP/2 when h2 is installed and one connect retry
+    device = C3850Device()
+    _capabilities = None
+    # Pay DNS + TCP + TLS now so the first tool call finds a warm pooled connection, and prefill
+    # the transceiver/interface caches while the client is still idle. Run in the background:
+    # an unreachable switch must not hold up the MCP handshake for the full timeout.
+    warmup = asyncio.create_task(device.warmup(prime_caches=True))
+    warmup.add_done_callback(_log_warmup_failure)
     try:
         yield
     finally:
-        if http_client:
-            await http_client.aclose()
+        warmup.cancel()
+        await device.aclose()
+
+def _log_warmup_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Warm-up connection to the switch failed: %s", task.exception())
 
 # Initialize with lifespan management
 mcp = FastMCP("cisco-3850", dependencies=["httpx"], lifespan=server_lifespan)
@@ -112,11 +202,13 @@ async def get_capabilities() -> str:
     Returns:
         A summary of supported features, tools, and device information.
     """
-    capabilities = device.get_capabilities()
-    return str(capabilities)
+    global _capabilities
+    if _capabilities is None:
+        _capabilities = _serialize(device.get_capabilities())
+    return _capabilities
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
+@single_flight
 async def get_interfaces_status(status_filter: Optional[str] = None) -> str:
     """Get the status of all interfaces (up/down, speed, duplex, vlan).
     
@@ -125,40 +217,40 @@ async def get_interfaces_status(status_filter: Optional[str] = None) -> str:
                        Use 'connected' to ignore unused ports.
     """
     result = await device.get_interfaces_status(status_filter)
-    return str(result)
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
+@single_flight
 async def get_vlan_brief() -> str:
     """Get a brief summary of all VLANs."""
     result = await device.get_vlan_brief()
-    return str(result)
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
+@single_flight
 async def get_system_summary() -> str:
     """Get system summary information (version, uptime, etc)."""
     result = await device.get_system_summary()
-    return str(result)
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
+@single_flight
 async def get_transceiver_stats() -> str:
     """Get optical levels (dBm) for fiber interfaces. 
     USE THIS IF: User suspects physical layer issues, bad cables, or low light levels.
     """
     result = await device.get_transceiver_stats()
-    return str(result)
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
+@single_flight
 async def get_device_health() -> str:
     """Get device health metrics (CPU, Memory, Environment)."""
     result = await device.get_device_health()
-    return str(result)
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
+@single_flight
 async def get_recent_logs(count: int = 50, search_term: Optional[str] = None) -> str:
     """Get the most recent log messages.
     
@@ -167,17 +259,16 @@ async def get_recent_logs(count: int = 50, search_term: Optional[str] = None) ->
         search_term: Optional. Filter logs by this term (case-insensitive).
     """
     result = await device.get_recent_logs(count, search_term)
-    return str(result)
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
+@single_flight
 async def check_interface_errors() -> str:
     """Check for interface errors (CRC, etc)."""
     result = await device.check_interface_errors()
-    return str(result)
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
 async def set_interface_state(interface: str, state: str, confirm: bool = False) -> str:
     """Set an interface state to 'up' or 'down'.
     
@@ -186,17 +277,18 @@ async def set_interface_state(interface: str, state: str, confirm: bool = False)
         state: Desired state ('up' or 'down').
         confirm: Set to True to execute the change after reviewing the blast radius.
     """
-    interface = device.normalize_interface_name(interface)
-    impact = await device.analyze_interface_impact(interface)
-    
+    interface = C3850Device.normalize_interface_name(interface)
+    # The analysis only matters for the report; a confirmed change goes straight to the device
     if not confirm:
+        impact = await cached_impact(("interface", interface), lambda: device.analyze_interface_impact(interface))
         return format_blast_radius_report(impact)
 
     result = await device.set_interface_state(interface, state)
-    return str(result)
+    # The change may alter what the analysis reported
+    _impact_cache.clear()
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
 async def set_interface_vlan(interface: str, vlan_id: int, confirm: bool = False) -> str:
     """Assign an interface to a specific VLAN (access mode).
     
@@ -205,17 +297,18 @@ async def set_interface_vlan(interface: str, vlan_id: int, confirm: bool = False
         vlan_id: VLAN ID.
         confirm: Set to True to execute.
     """
-    interface = device.normalize_interface_name(interface)
-    impact = await device.analyze_interface_impact(interface)
-    
+    interface = C3850Device.normalize_interface_name(interface)
+    # The analysis only matters for the report; a confirmed change goes straight to the device
     if not confirm:
+        impact = await cached_impact(("interface", interface), lambda: device.analyze_interface_impact(interface))
         return format_blast_radius_report(impact)
 
     result = await device.set_interface_vlan(interface, vlan_id)
-    return str(result)
+    # The change may alter what the analysis reported
+    _impact_cache.clear()
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
 async def set_vlan_name(vlan_id: int, name: str, confirm: bool = False) -> str:
     """Set the name of a VLAN.
     
@@ -224,16 +317,15 @@ async def set_vlan_name(vlan_id: int, name: str, confirm: bool = False) -> str:
         name: New name for the VLAN.
         confirm: Set to True to execute.
     """
-    impact = await device.analyze_vlan_impact(vlan_id)
-    
     if not confirm:
+        impact = await cached_impact(("vlan", vlan_id), lambda: device.analyze_vlan_impact(vlan_id))
         return format_blast_radius_report(impact)
 
     result = await device.set_vlan_name(vlan_id, name)
-    return str(result)
+    _impact_cache.clear()
+    return _serialize(result)
 
-@mcp.tool()
-@tool_error_handler
+@mcp_tool_with_errors()
 async def bounce_interface(interface: str, confirm: bool = False) -> str:
     """Bounce (shutdown then no shutdown) an interface.
     
@@ -241,14 +333,21 @@ async def bounce_interface(interface: str, confirm: bool = False) -> str:
         interface: Interface name.
         confirm: Set to True to execute.
     """
-    interface = device.normalize_interface_name(interface)
-    impact = await device.analyze_interface_impact(interface)
-    
+    interface = C3850Device.normalize_interface_name(interface)
+    # The analysis only matters for the report; a confirmed change goes straight to the device
     if not confirm:
+        impact = await cached_impact(("interface", interface), lambda: device.analyze_interface_impact(interface))
         return format_blast_radius_report(impact)
 
     result = await device.bounce_interface(interface)
-    return str(result)
+    # The change may alter what the analysis reported
+    _impact_cache.clear()
+    return _serialize(result)
+
+def main() -> None:
+    """Console entry point (c3850-mcp): serve over stdio."""
+    # Same as mcp.run() (stdio), but on uvloop when it is installed
+    aio.run(mcp.run_stdio_async())
 
 if __name__ == "__main__":
-    mcp.run()
+    main()
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock
+
+from c3850_mcp.daemon import DaemonClient, DaemonError, DeviceDaemon, connect
+from c3850_mcp.device import InterfaceStatus
+
+class TestDeviceDaemon(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.socket_path = os.path.join(tempfile.mkdtemp(), "c3850d.sock")
+        self.device = AsyncMock()
+        self.daemon = DeviceDaemon(device=self.device, socket_path=self.socket_path)
+        self.server_task = asyncio.create_task(self.daemon.serve_forever())
+        while not os.path.exists(self.socket_path):
+            await asyncio.sleep(0.01)
+
+    async def asyncTearDown(self):
+        self.server_task.cancel()
+        try:
+            await self.server_task
+        except asyncio.CancelledError:
+            pass
+
+    async def test_round_trip_returns_typed_rows(self):
+        row = InterfaceStatus(name="GigabitEthernet1/0/1", description="WAP", admin_status="up")
+        self.device.get_interfaces_status = AsyncMock(return_value=[row])
+
+        async with connect(self.socket_path) as client:
+            self.assertIsInstance(client, DaemonClient)
+            results = await asyncio.gather(
+                client.get_interfaces_status(),
+                client.get_interfaces_status(status_filter="up"),
+            )
+
+        self.assertEqual(results, [[row], [row]])
+        self.device.get_interfaces_status.assert_any_await(status_filter="up")
+
+    async def test_device_errors_and_unknown_methods(self):
+        # Coalesced writes reach the device through its unbatched path
+        self.device._apply_interface_state = AsyncMock(side_effect=RuntimeError("boom"))
+
+        async with connect(self.socket_path) as client:
+            with self.assertRaisesRegex(DaemonError, "boom"):
+                await client.set_interface_state("GigabitEthernet1/0/1", "up")
+            # Private helpers like _request are never forwarded
+            with self.assertRaises(AttributeError):
+                client._request
+
+    async def test_state_writes_are_coalesced(self):
+        self.device.set_interface_states = AsyncMock(return_value={})
+        self.device.set_interface_state = AsyncMock(return_value={})
+        self.device._apply_interface_state = AsyncMock(return_value={})
+
+        async with connect(self.socket_path) as client:
+            await asyncio.gather(
+                client.set_interface_state("GigabitEthernet1/0/1", "down"),
+                client.set_interface_state("GigabitEthernet1/0/2", "down"),
+                client.set_interface_state("GigabitEthernet1/0/1", "up"),
+            )
+            await client.set_interface_state("GigabitEthernet1/0/3", "up", force_immediate=True)
+
+        # Gi1/0/1's later 'up' can't replace its 'down'; it follows in its own write, unbatched
+        self.device.set_interface_states.assert_awaited_once_with(
+            {"GigabitEthernet1/0/1": "down", "GigabitEthernet1/0/2": "down"}
+        )
+        self.device._apply_interface_state.assert_awaited_once_with("GigabitEthernet1/0/1", "up")
+        self.device.set_interface_state.assert_awaited_once_with("GigabitEthernet1/0/3", "up")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,289 @@
+import asyncio
+import socket
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from c3850_mcp.device import YANG_PATCH_CONTENT_TYPE, C3850Device, DeviceConfig, InterfaceStateBatcher, _socket_options
+
+class TestNativeInterfaceKey(unittest.IsolatedAsyncioTestCase):
+    def test_splits_type_and_number(self):
+        device = C3850Device()
+        self.assertEqual(device._native_interface_key("TenGigabitEthernet1/0/2"), ("TenGigabitEthernet", "1/0/2"))
+        self.assertEqual(device._native_interface_key("GigabitEthernet1/0/1"), ("GigabitEthernet", "1/0/1"))
+        # Contains 'GigabitEthernet' as a substring; must not be mistaken for it
+        self.assertEqual(device._native_interface_key("FortyGigabitEthernet1/1/1"), ("FortyGigabitEthernet", "1/1/1"))
+        self.assertEqual(device._native_interface_key("Port-channel1"), (None, None))
+
+    async def test_set_interface_vlan_rejects_unsupported_types(self):
+        device = C3850Device()
+        device._request = AsyncMock(return_value={})
+        with self.assertRaises(ValueError):
+            await device.set_interface_vlan("Vlan10", 20)
+        device._request.assert_not_called()
+
+    async def test_set_interface_vlan_targets_tengig_not_gig(self):
+        # 'GigabitEthernet' is a substring of 'TenGigabitEthernet'; the write must still go to the TenGig list
+        device = C3850Device()
+        device._request = AsyncMock(return_value={})
+        await device.set_interface_vlan("Te1/0/2", 20)
+
+        method, path = device._request.await_args.args
+        payload = device._request.await_args.kwargs["json"]
+        self.assertEqual(method, "PATCH")
+        self.assertEqual(path, "/Cisco-IOS-XE-native:native/interface/TenGigabitEthernet=1%2F0%2F2")
+        self.assertEqual(payload["Cisco-IOS-XE-native:TenGigabitEthernet"]["name"], "1/0/2")
+
+class TestSocketOptions(unittest.TestCase):
+    @unittest.skipUnless(hasattr(socket, "TCP_KEEPCNT"), "platform lacks TCP_KEEPCNT")
+    def test_bad_keepalive_env_falls_back_to_default(self):
+        with patch.dict("os.environ", {"C3850_TCP_KEEPCNT": "five"}), self.assertLogs("c3850-device", "WARNING"):
+            options = _socket_options()
+        self.assertIn((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 5), options)
+
+class TestWriteBatching(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_state_changes_share_one_bulk_write(self):
+        device = C3850Device(DeviceConfig(host="sw", username="u", password="p", write_batch_window=0.01))
+        device._request = AsyncMock(return_value={})
+
+        await asyncio.gather(
+            device.set_interface_state("Gi1/0/1", "up"),
+            device.set_interface_state("Gi1/0/2", "down"),
+            device.set_interface_state("GigabitEthernet1/0/1", "up"),
+        )
+        # One set_interface_states() write; the repeated 'up' for Gi1/0/1 shares it
+        self.assertCountEqual(
+            [call.args for call in device._request.await_args_list],
+            [
+                ("PATCH", "/ietf-interfaces:interfaces"),
+                ("PATCH", "/Cisco-IOS-XE-native:native/interface"),
+                ("DELETE", "/Cisco-IOS-XE-native:native/interface/GigabitEthernet=1%2F0%2F1/shutdown"),
+            ],
+        )
+
+    async def test_conflicting_states_for_one_port_are_written_in_order(self):
+        apply_one = AsyncMock(return_value={})
+        apply_many = AsyncMock(return_value={})
+        batcher = InterfaceStateBatcher(0.01, apply_one, apply_many)
+        await asyncio.gather(
+            batcher.submit("Gi1/0/1", "down"),
+            batcher.submit("Gi1/0/2", "down"),
+            batcher.submit("Gi1/0/1", "up"),
+        )
+        apply_many.assert_awaited_once_with({"GigabitEthernet1/0/1": "down", "GigabitEthernet1/0/2": "down"})
+        apply_one.assert_awaited_once_with("GigabitEthernet1/0/1", "up")
+
+    async def test_failed_bulk_write_only_fails_the_bad_port(self):
+        async def apply_one(interface, state):
+            if interface == "GigabitEthernet1/0/2":
+                raise RuntimeError("rejected")
+            return {}
+
+        batcher = InterfaceStateBatcher(0.01, apply_one, AsyncMock(side_effect=RuntimeError("rejected")))
+        good, bad = await asyncio.gather(
+            batcher.submit("Gi1/0/1", "down"), batcher.submit("Gi1/0/2", "down"), return_exceptions=True
+        )
+        self.assertEqual(good, {})
+        self.assertIsInstance(bad, RuntimeError)
+
+    async def test_unbatched_write_never_sleeps(self):
+        # write_batch_window defaults to 0: writes go straight out, with no coalescing delay
+        device = C3850Device(DeviceConfig(host="sw", username="u", password="p"))
+        device._request = AsyncMock(return_value={})
+        with patch("c3850_mcp.device.asyncio.sleep", new=AsyncMock()) as sleep:
+            await device.set_interface_state("Gi1/0/1", "down")
+        sleep.assert_not_awaited()
+        self.assertTrue(device._request.await_count)
+
+    async def test_cancelled_flush_fails_waiters_instead_of_hanging(self):
+        started = asyncio.Event()
+
+        async def slow_apply(interface, state):
+            started.set()
+            await asyncio.sleep(10)
+
+        batcher = InterfaceStateBatcher(0, slow_apply, AsyncMock(return_value={}))
+        first = batcher.submit("Gi1/0/1", "down")
+        await started.wait()
+        second = batcher.submit("Gi1/0/2", "down")
+        batcher._flush_task.cancel()
+        for waiter in (first, second):
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+        self.assertIsNone(batcher._flush_task)
+
+class TestInterfaceState(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_native_write_skips_ietf_write(self):
+        device = C3850Device()
+        request = httpx.Request("PATCH", "https://switch/restconf/data")
+
+        async def fake_request(method, path, **kwargs):
+            if path.startswith("/Cisco-IOS-XE-native:"):
+                raise httpx.HTTPStatusError("409", request=request, response=httpx.Response(409, request=request))
+            return {}
+
+        device._request = AsyncMock(side_effect=fake_request)
+        with self.assertRaises(httpx.HTTPStatusError):
+            await device.set_interface_state("Gi1/0/1", "down")
+        # Nothing reached the IETF model, so the port isn't left half-configured
+        self.assertEqual([call.args[1] for call in device._request.await_args_list],
+                         ["/Cisco-IOS-XE-native:native/interface/GigabitEthernet=1%2F0%2F1"])
+
+    async def test_bring_up_tolerates_missing_shutdown(self):
+        device = C3850Device()
+        request = httpx.Request("DELETE", "https://switch/restconf/data")
+
+        async def fake_request(method, path, **kwargs):
+            if method == "DELETE":
+                raise httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+            return {}
+
+        device._request = AsyncMock(side_effect=fake_request)
+        await device.set_interface_states({"Gi1/0/1": "up", "Gi1/0/2": "up"})
+        self.assertEqual([call.args[0] for call in device._request.await_args_list], ["DELETE", "DELETE", "PATCH"])
+
+class TestConcurrencyCap(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_beyond_max_concurrency_queue(self):
+        in_flight = peak = 0
+
+        async def slow_request(method, url, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json={}, request=httpx.Request(method, url))
+
+        client = AsyncMock()
+        client.request = AsyncMock(side_effect=slow_request)
+        device = C3850Device(DeviceConfig(host="sw", username="u", password="p", max_concurrency=2), http_client=client)
+        await asyncio.gather(*(device._request("GET", f"/path/{i}") for i in range(10)))
+        # All ten complete, but never more than two reach the switch at once
+        self.assertEqual(client.request.await_count, 10)
+        self.assertEqual(peak, 2)
+
+class TestDeviceHealth(unittest.IsolatedAsyncioTestCase):
+    async def test_health_fetches_subtrees_concurrently_and_tolerates_missing_environment(self):
+        in_flight, peak = 0, 0
+
+        async def fake_request(method, path, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if "environment" in path:
+                raise RuntimeError("unknown model")
+            if "cpu" in path:
+                return {"Cisco-IOS-XE-process-cpu-oper:cpu-usage": {"cpu-utilization": {"five-seconds": 7}}}
+            return {"Cisco-IOS-XE-process-memory-oper:memory-usage-processes": {"memory-usage-process": [{}]}}
+
+        device = C3850Device()
+        device._request = AsyncMock(side_effect=fake_request)
+        health = await device.get_device_health()
+
+        self.assertEqual(peak, 3)
+        self.assertEqual(health, {"cpu_usage_percent": 7, "memory_usage": "Check details", "environment_summary": "Unknown"})
+
+    async def test_health_propagates_cancellation(self):
+        async def fake_request(method, path, **kwargs):
+            if "environment" in path:
+                raise asyncio.CancelledError()
+            return {}
+
+        device = C3850Device()
+        device._request = AsyncMock(side_effect=fake_request)
+        with self.assertRaises(asyncio.CancelledError):
+            await device.get_device_health()
+
+    async def test_environment_is_cached_across_health_checks(self):
+        device = C3850Device()
+        device._request = AsyncMock(return_value={})
+        await device.get_device_health()
+        device.__dict__.pop("_ttl_cache_get_device_health", None)
+        await device.get_device_health()
+        env_calls = [call for call in device._request.await_args_list if "environment" in call.args[1]]
+        self.assertEqual(len(env_calls), 1)
+
+class TestBounceInterface(unittest.IsolatedAsyncioTestCase):
+    async def test_bounce_sends_one_yang_patch_per_step(self):
+        device = C3850Device()
+        device._request = AsyncMock(return_value={})
+        await device.bounce_interface("Gi1/0/1")
+
+        self.assertEqual(device._request.await_count, 2)
+        (down_args, down_kwargs), (up_args, up_kwargs) = device._request.await_args_list
+        self.assertEqual(down_args, ("PATCH", ""))
+        self.assertEqual(down_kwargs["content_type"], YANG_PATCH_CONTENT_TYPE)
+        down_edits = down_kwargs["json"]["ietf-yang-patch:yang-patch"]["edit"]
+        up_edits = up_kwargs["json"]["ietf-yang-patch:yang-patch"]["edit"]
+        self.assertEqual([e["operation"] for e in down_edits], ["merge", "merge"])
+        self.assertEqual([e["operation"] for e in up_edits], ["remove", "merge"])
+        self.assertEqual(up_edits[1]["value"]["ietf-interfaces:interface"][0]["enabled"], True)
+
+    async def test_bounce_falls_back_when_yang_patch_unsupported(self):
+        device = C3850Device()
+        request = httpx.Request("PATCH", "https://switch/restconf/data")
+        rejected = httpx.HTTPStatusError("415", request=request, response=httpx.Response(415, request=request))
+
+        async def fake_request(method, path, json=None, content_type=None, **kwargs):
+            if content_type == YANG_PATCH_CONTENT_TYPE:
+                raise rejected
+            return {}
+
+        device._request = AsyncMock(side_effect=fake_request)
+        await device.bounce_interface("GigabitEthernet1/0/1")
+        # One rejected YANG-Patch, then the per-root writes for down and up
+        self.assertEqual(device._request.await_count, 5)
+        self.assertIs(device._yang_patch_supported, False)
+
+        device._request.reset_mock()
+        await device.bounce_interface("GigabitEthernet1/0/1")
+        self.assertEqual(device._request.await_count, 4)
+
+    async def test_bounce_reenables_port_when_up_patch_rejected(self):
+        device = C3850Device()
+        request = httpx.Request("PATCH", "https://switch/restconf/data")
+        patches = []
+
+        async def fake_request(method, path, json=None, content_type=None, **kwargs):
+            if content_type == YANG_PATCH_CONTENT_TYPE:
+                patches.append(json)
+                if len(patches) == 2:
+                    raise httpx.HTTPStatusError("400", request=request, response=httpx.Response(400, request=request))
+            return {}
+
+        device._request = AsyncMock(side_effect=fake_request)
+        await device.bounce_interface("GigabitEthernet1/0/1")
+        # The shut landed as a YANG-Patch; the rejected no shut was redone with plain writes
+        fallback = [call for call in device._request.await_args_list if call.kwargs.get("content_type") is None]
+        self.assertIn(("DELETE", "/Cisco-IOS-XE-native:native/interface/GigabitEthernet=1%2F0%2F1/shutdown"),
+                      [call.args for call in fallback])
+        ietf = next(call for call in fallback if call.args[1].startswith("/ietf-interfaces:"))
+        self.assertEqual(ietf.kwargs["json"]["ietf-interfaces:interface"]["enabled"], True)
+
+    async def test_repeated_400s_disable_yang_patch(self):
+        device = C3850Device()
+        request = httpx.Request("PATCH", "https://switch/restconf/data")
+        bad_request = httpx.HTTPStatusError("400", request=request, response=httpx.Response(400, request=request))
+
+        async def fake_request(method, path, json=None, content_type=None, **kwargs):
+            if content_type == YANG_PATCH_CONTENT_TYPE:
+                raise bad_request
+            return {}
+
+        device._request = AsyncMock(side_effect=fake_request)
+        # The fallback writes go straight to the device, never through the public (batchable) path
+        device.set_interface_state = AsyncMock()
+        for _ in range(3):
+            await device.bounce_interface("GigabitEthernet1/0/1")
+        self.assertIs(device._yang_patch_supported, False)
+        device.set_interface_state.assert_not_awaited()
+
+        device._request.reset_mock()
+        await device.bounce_interface("GigabitEthernet1/0/1")
+        self.assertFalse(any(call.kwargs.get("content_type") for call in device._request.await_args_list))
+
+if __name__ == "__main__":
+    unittest.main()
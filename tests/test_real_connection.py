@@ -1,10 +1,4 @@
 import asyncio
-import sys
-import os
-from pathlib import Path
-
-# Add src to path
-sys.path.append(str(Path.cwd() / "src"))
 
 from c3850_mcp.device import C3850Device
 from dotenv import load_dotenv
@@ -29,10 +23,10 @@ async def main():
         print(f"Found {len(status)} interfaces matching '{target_interface}'")
         
         for interface in status:
-            print(f"Interface: {interface['name']}")
-            print(f"  Admin Status: {interface['admin_status']}")
-            print(f"  Oper Status: {interface['oper_status']}")
-            print(f"  Description: {interface['description']}")
+            print(f"Interface: {interface.name}")
+            print(f"  Admin Status: {interface.admin_status}")
+            print(f"  Oper Status: {interface.oper_status}")
+            print(f"  Description: {interface.description}")
             
     except Exception as e:
         print(f"Error: {e}")
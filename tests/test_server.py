@@ -1,55 +1,86 @@
 import asyncio
 import unittest
 from unittest.mock import AsyncMock, patch
+from c3850_mcp import server
+from c3850_mcp.device import C3850Device
 from c3850_mcp.server import mcp
 
 class TestC3850MCPServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # One patcher per test, undone by cleanup; every test talks to the same stand-in device.
+        # spec= makes every device coroutine an AsyncMock up front and rejects misspelled methods.
+        patcher = patch("c3850_mcp.server.device", AsyncMock(spec=C3850Device))
+        self.device = patcher.start()
+        self.addCleanup(patcher.stop)
+        # Analyses cached by an earlier test must not answer for this one
+        server._impact_cache.clear()
+
     async def test_get_interfaces_status(self):
-        with patch("c3850_mcp.server.device") as mock_device:
-            # Mock async method returning raw structure
-            mock_device.get_interfaces_status = AsyncMock(return_value=[
-                {"name": "GigabitEthernet1/0/1", "admin_status": "up", "oper_status": "up", "speed": 1000000000, "mac": "00:11:22:33:44:55"}
-            ])
-            result = await mcp.call_tool("get_interfaces_status", {})
-            # result is (content_list, meta_dict)
-            content = result[0]
-            self.assertIn("GigabitEthernet1/0/1", content[0].text)
-            self.assertIn("00:11:22:33:44:55", content[0].text)
-            mock_device.get_interfaces_status.assert_called_once()
+        # Mock async method returning raw structure
+        self.device.get_interfaces_status.return_value = [
+            {"name": "GigabitEthernet1/0/1", "admin_status": "up", "oper_status": "up", "speed": 1000000000, "mac": "00:11:22:33:44:55"}
+        ]
+        result = await mcp.call_tool("get_interfaces_status", {})
+        # result is (content_list, meta_dict)
+        content = result[0]
+        self.assertIn("GigabitEthernet1/0/1", content[0].text)
+        self.assertIn("00:11:22:33:44:55", content[0].text)
+        self.device.get_interfaces_status.assert_called_once()
 
     async def test_get_vlan_brief(self):
-        with patch("c3850_mcp.server.device") as mock_device:
-            mock_device.get_vlan_brief = AsyncMock(return_value=[
-                {"id": 10, "name": "User_VLAN", "status": "active", "ports": ["Gi1/0/1"]}
-            ])
-            result = await mcp.call_tool("get_vlan_brief", {})
-            content = result[0]
-            self.assertIn("User_VLAN", content[0].text)
-            mock_device.get_vlan_brief.assert_called_once()
+        self.device.get_vlan_brief.return_value = [
+            {"id": 10, "name": "User_VLAN", "status": "active", "ports": ["Gi1/0/1"]}
+        ]
+        result = await mcp.call_tool("get_vlan_brief", {})
+        content = result[0]
+        self.assertIn("User_VLAN", content[0].text)
+        self.device.get_vlan_brief.assert_called_once()
 
     async def test_set_interface_state(self):
-        with patch("c3850_mcp.server.device") as mock_device:
-            mock_device.set_interface_state = AsyncMock(return_value={})
-            result = await mcp.call_tool("set_interface_state", {"interface": "GigabitEthernet1/0/1", "state": "up"})
-            content = result[0]
-            self.assertEqual(content[0].text, "{}")
-            mock_device.set_interface_state.assert_called_once_with("GigabitEthernet1/0/1", "up")
+        self.device.set_interface_state.return_value = {}
+        result = await mcp.call_tool("set_interface_state", {"interface": "GigabitEthernet1/0/1", "state": "up", "confirm": True})
+        content = result[0]
+        self.assertEqual(content[0].text, "{}")
+        self.device.set_interface_state.assert_called_once_with("GigabitEthernet1/0/1", "up")
 
     async def test_set_interface_vlan(self):
-        with patch("c3850_mcp.server.device") as mock_device:
-            mock_device.set_interface_vlan = AsyncMock(return_value={})
-            result = await mcp.call_tool("set_interface_vlan", {"interface": "GigabitEthernet1/0/1", "vlan_id": 10})
-            content = result[0]
-            self.assertEqual(content[0].text, "{}")
-            mock_device.set_interface_vlan.assert_called_once_with("GigabitEthernet1/0/1", 10)
+        self.device.set_interface_vlan.return_value = {}
+        result = await mcp.call_tool("set_interface_vlan", {"interface": "GigabitEthernet1/0/1", "vlan_id": 10, "confirm": True})
+        content = result[0]
+        self.assertEqual(content[0].text, "{}")
+        self.device.set_interface_vlan.assert_called_once_with("GigabitEthernet1/0/1", 10)
 
     async def test_bounce_interface(self):
-        with patch("c3850_mcp.server.device") as mock_device:
-            mock_device.bounce_interface = AsyncMock(return_value={})
-            result = await mcp.call_tool("bounce_interface", {"interface": "GigabitEthernet1/0/1"})
-            content = result[0]
-            self.assertEqual(content[0].text, "{}")
-            mock_device.bounce_interface.assert_called_once_with("GigabitEthernet1/0/1")
+        self.device.bounce_interface.return_value = {}
+        result = await mcp.call_tool("bounce_interface", {"interface": "GigabitEthernet1/0/1", "confirm": True})
+        content = result[0]
+        self.assertEqual(content[0].text, "{}")
+        self.device.bounce_interface.assert_called_once_with("GigabitEthernet1/0/1")
+
+    async def test_concurrent_bounces_each_reach_the_device(self):
+        self.device.bounce_interface.return_value = {}
+        interfaces = [f"GigabitEthernet1/0/{i}" for i in range(1, 51)]
+        await asyncio.gather(*(
+            mcp.call_tool("bounce_interface", {"interface": name, "confirm": True}) for name in interfaces
+        ))
+        # Writes are never coalesced or dropped at the tool layer; the device's request cap paces them
+        self.assertEqual([call.args for call in self.device.bounce_interface.await_args_list],
+                         [(name,) for name in interfaces])
+
+    async def test_unconfirmed_write_only_reports_impact(self):
+        impact = {"interface": "GigabitEthernet1/0/2", "risk_level": "HIGH", "warnings": ["Uplink to core"]}
+        self.device.analyze_interface_impact.return_value = impact
+        self.device.set_interface_state.return_value = {}
+        for _ in range(2):
+            result = await mcp.call_tool("set_interface_state", {"interface": "Gi1/0/2", "state": "down"})
+            self.assertIn("Uplink to core", result[0][0].text)
+        # The repeat was answered from the analysis cache
+        self.device.analyze_interface_impact.assert_awaited_once_with("GigabitEthernet1/0/2")
+        self.device.set_interface_state.assert_not_called()
+
+        await mcp.call_tool("set_interface_state", {"interface": "Gi1/0/2", "state": "down", "confirm": True})
+        self.device.set_interface_state.assert_awaited_once_with("GigabitEthernet1/0/2", "down")
+        self.assertEqual(self.device.analyze_interface_impact.await_count, 1)
 
 if __name__ == "__main__":
     unittest.main()
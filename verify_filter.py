@@ -1,45 +1,47 @@
 import sys
-import os
 import asyncio
 from typing import List
 
-# Add src to path
-sys.path.append(os.path.join(os.getcwd(), "src"))
+from c3850_mcp import aio
+from c3850_mcp.daemon import connect
 
-# Load env vars
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass
+# Only names and oper-status are checked; this also skips the config GET
+_FIELDS = ("name", "oper-status")
 
-from c3850_mcp.device import C3850Device
+# The management port; a name filter should only return interfaces starting with it
+_NAME_PREFIX = "GigabitEthernet0/0"
+
+_FILTERS = ("up", "down", _NAME_PREFIX)
 
 async def main():
-    device = C3850Device()
-    
-    print("--- Testing Filter: 'up' ---")
-    up_interfaces = await device.get_interfaces_status(status_filter="up")
-    print(f"Found {len(up_interfaces)} UP interfaces.")
-    for iface in up_interfaces:
-        if iface['oper_status'] != 'up':
-            print(f"ERROR: Found non-UP interface: {iface['name']} ({iface['oper_status']})")
-            
-    print("\n--- Testing Filter: 'down' ---")
-    down_interfaces = await device.get_interfaces_status(status_filter="down")
-    print(f"Found {len(down_interfaces)} DOWN interfaces.")
-    for iface in down_interfaces:
-        if iface['oper_status'] != 'down':
-            print(f"ERROR: Found non-DOWN interface: {iface['name']} ({iface['oper_status']})")
-
-    print("\n--- Testing Filter: 'GigabitEthernet0/0' ---")
-    specific_interfaces = await device.get_interfaces_status(status_filter="GigabitEthernet0/0")
-    print(f"Found {len(specific_interfaces)} matching interfaces.")
-    for iface in specific_interfaces:
-        if "GigabitEthernet0/0" not in iface['name']:
-             print(f"ERROR: Found non-matching interface: {iface['name']}")
-        else:
-            print(f"  - {iface['name']}")
+    async with connect() as device:
+        # Independent probes: issue all three at once over the shared connection
+        up_interfaces, down_interfaces, specific_interfaces = await asyncio.gather(
+            *(device.get_interfaces_status(status_filter=f, fields=_FIELDS) for f in _FILTERS)
+        )
+
+        # Build the whole report and write it once rather than one print() per row
+        lines = ["--- Testing Filter: 'up' ---", f"Found {len(up_interfaces)} UP interfaces."]
+        bad_up = [i for i in up_interfaces if i.oper_status != 'up']
+        lines += [f"ERROR: Found non-UP interface: {i.name} ({i.oper_status})" for i in bad_up]
+
+        lines += ["", "--- Testing Filter: 'down' ---", f"Found {len(down_interfaces)} DOWN interfaces."]
+        bad_down = [i for i in down_interfaces if i.oper_status != 'down']
+        lines += [f"ERROR: Found non-DOWN interface: {i.name} ({i.oper_status})" for i in bad_down]
+
+        lines += ["", f"--- Testing Filter: '{_NAME_PREFIX}' ---", f"Found {len(specific_interfaces)} matching interfaces."]
+        bad_names = []
+        for iface in specific_interfaces:
+            if iface.name.startswith(_NAME_PREFIX):
+                lines.append(f"  - {iface.name}")
+            else:
+                lines.append(f"ERROR: Found non-matching interface: {iface.name}")
+                bad_names.append(iface.name)
+
+        sys.stdout.write("\n".join(lines) + "\n")
+
+        # Non-zero exit so CI can gate on the filters behaving
+        return 1 if bad_up or bad_down or bad_names else 0
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(aio.run(main()))
@@ -1,6 +1,13 @@
 import sys
-import os
-sys.path.append(os.path.join(os.getcwd(), "src"))
+import importlib.util
+
+# Resolving the module is enough to prove the install; pass --full to actually import it
+if "--full" not in sys.argv[1:]:
+    if importlib.util.find_spec("c3850_mcp.server") is None:
+        print("Failed to find c3850_mcp.server")
+        sys.exit(1)
+    print("Found c3850_mcp.server")
+    sys.exit(0)
 
 try:
     from c3850_mcp.server import mcp